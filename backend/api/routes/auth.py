@@ -2,13 +2,18 @@
 Auth API routes - simplified to use PlaywrightManager.
 """
 
-from fastapi import APIRouter, Form, HTTPException
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
+from typing import Any
+import logging
 import os
-import json
+import asyncio
 
+from core import json_utils
 from core.playwright_manager import PlaywrightManager, COOKIES_FILE
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
@@ -18,8 +23,6 @@ class BrowserLoginResponse(BaseModel):
     cookie_count: int = 0
 
 
-from typing import Any
-
 class CredentialsRequest(BaseModel):
     credentials: Any  # Accept both dict and list
 
@@ -47,7 +50,7 @@ async def credential_login(request: CredentialLoginRequest):
             cookie_count=result.get("cookie_count", 0)
         )
     except Exception as e:
-        print(f"DEBUG: Credential login error: {e}")
+        logger.error("Credential login error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -65,7 +68,7 @@ async def browser_login():
             cookie_count=result.get("cookie_count", 0)
         )
     except Exception as e:
-        print(f"DEBUG: Browser login error: {e}")
+        logger.error("Browser login error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -82,7 +85,7 @@ async def save_credentials(request: CredentialsRequest):
             raise HTTPException(status_code=400, detail="No cookies found in credentials")
         
         # Save full cookie list with domains/paths preserved
-        PlaywrightManager.save_credentials(cookies, user_agent)
+        await PlaywrightManager.save_credentials_async(cookies, user_agent)
         
         return {
             "status": "success",
@@ -93,37 +96,64 @@ async def save_credentials(request: CredentialsRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Last computed auth status, keyed by the cookie file's mtime
+_status_cache = {"mtime": None, "payload": None}
+
+
+def _read_auth_status() -> dict:
+    """Read the cookie file and report whether a session is present."""
+    try:
+        mtime = os.stat(COOKIES_FILE).st_mtime_ns
+    except OSError:
+        return {"authenticated": False, "cookie_count": 0}
+    
+    if _status_cache["mtime"] == mtime:
+        return dict(_status_cache["payload"])
+    
+    # Single open + read; missing, empty or malformed files all land in except
+    try:
+        with open(COOKIES_FILE, "rb") as f:
+            data = f.read()
+        if not data:
+            raise ValueError("empty cookie file")
+        cookies = json_utils.loads(data)
+    except (OSError, ValueError):
+        payload = {"authenticated": False, "cookie_count": 0}
+    else:
+        # Handle both dict and list formats
+        if isinstance(cookies, dict):
+            has_session = "sessionid" in cookies
+            cookie_count = len(cookies)
+        elif isinstance(cookies, list):
+            has_session = any(c.get("name") == "sessionid" for c in cookies if isinstance(c, dict))
+            cookie_count = len(cookies)
+        else:
+            has_session = False
+            cookie_count = 0
+        payload = {
+            "authenticated": has_session,
+            "cookie_count": cookie_count
+        }
+    
+    _status_cache["mtime"] = mtime
+    _status_cache["payload"] = payload
+    return dict(payload)
+
+
 @router.get("/status")
 async def auth_status():
     """Check if we have stored cookies."""
-    if os.path.exists(COOKIES_FILE) and os.path.getsize(COOKIES_FILE) > 0:
-        try:
-            with open(COOKIES_FILE, "r") as f:
-                cookies = json.load(f)
-                # Handle both dict and list formats
-                if isinstance(cookies, dict):
-                    has_session = "sessionid" in cookies
-                    cookie_count = len(cookies)
-                elif isinstance(cookies, list):
-                    has_session = any(c.get("name") == "sessionid" for c in cookies if isinstance(c, dict))
-                    cookie_count = len(cookies)
-                else:
-                    has_session = False
-                    cookie_count = 0
-                return {
-                    "authenticated": has_session,
-                    "cookie_count": cookie_count
-                }
-        except:
-            pass
-    return {"authenticated": False, "cookie_count": 0}
+    return await asyncio.to_thread(_read_auth_status)
 
 
 @router.post("/logout")
 async def logout():
     """Clear stored credentials."""
-    if os.path.exists(COOKIES_FILE):
-        os.remove(COOKIES_FILE)
+    try:
+        await asyncio.to_thread(os.remove, COOKIES_FILE)
+    except FileNotFoundError:
+        pass
+    PlaywrightManager.invalidate_credentials_cache()
     return {"status": "success", "message": "Logged out"}
 
 
@@ -175,12 +205,13 @@ class AdminCookiesRequest(BaseModel):
 @router.post("/admin-login")
 async def admin_login(request: AdminLoginRequest):
     """Login as admin with password."""
-    print(f"DEBUG: Admin login attempt. Input: '{request.password}', Expected: '{ADMIN_PASSWORD}'")
     if request.password == ADMIN_PASSWORD:
         import secrets
         session_token = secrets.token_urlsafe(32)
         _admin_sessions.add(session_token)
         return {"status": "success", "token": session_token}
+    # Never log the passwords themselves
+    logger.warning("Failed admin login attempt")
     raise HTTPException(status_code=401, detail="Invalid password")
 
 
@@ -198,32 +229,31 @@ async def admin_update_cookies(request: AdminCookiesRequest, token: str = ""):
     
     try:
         cookies = request.cookies
+        has_session = False
         
-        # Preserve list if it contains metadata (like domain)
         if isinstance(cookies, list):
-            # Check if this is a simple name-value list or full objects
-            if len(cookies) > 0 and isinstance(cookies[0], dict) and "domain" not in cookies[0]:
-                cookie_dict = {}
-                for c in cookies:
-                    if isinstance(c, dict) and "name" in c and "value" in c:
-                        cookie_dict[c["name"]] = c["value"]
+            # Preserve list if it contains metadata (like domain),
+            # otherwise flatten simple name-value objects into a dict
+            flatten = len(cookies) > 0 and isinstance(cookies[0], dict) and "domain" not in cookies[0]
+            cookie_dict = {}
+            # Single pass: collect name-value pairs and look for sessionid together
+            for c in cookies:
+                if isinstance(c, dict) and "name" in c and "value" in c:
+                    cookie_dict[c["name"]] = c["value"]
+                    if c["name"] == "sessionid":
+                        has_session = True
+            if flatten:
                 cookies = cookie_dict
-        
-        if not isinstance(cookies, (dict, list)):
-            raise HTTPException(status_code=400, detail="Invalid cookies format")
-        
-        # Check for sessionid in both formats
-        has_session = False
-        if isinstance(cookies, dict):
+        elif isinstance(cookies, dict):
             has_session = "sessionid" in cookies
         else:
-            has_session = any(c.get("name") == "sessionid" for c in cookies if isinstance(c, dict))
+            raise HTTPException(status_code=400, detail="Invalid cookies format")
             
         if not has_session:
             raise HTTPException(status_code=400, detail="Missing 'sessionid' cookie - this is required")
         
         # Save cookies (either dict or list)
-        PlaywrightManager.save_credentials(cookies, None)
+        await PlaywrightManager.save_credentials_async(cookies, None)
         
         return {
             "status": "success",
@@ -236,25 +266,50 @@ async def admin_update_cookies(request: AdminCookiesRequest, token: str = ""):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Last masked cookie payload, keyed by the cookie file's mtime
+_masked_cache = {"mtime": None, "payload": None}
+
+
+def _read_masked_cookies() -> dict:
+    """Read the cookie file and mask values for display."""
+    try:
+        mtime = os.stat(COOKIES_FILE).st_mtime_ns
+    except OSError:
+        return {"cookies": {}, "raw_count": 0}
+    
+    if _masked_cache["mtime"] != mtime:
+        payload = {"cookies": {}, "raw_count": 0}
+        try:
+            with open(COOKIES_FILE, "rb") as f:
+                cookies = json_utils.loads(f.read())
+            # Handle both dict and list formats
+            if isinstance(cookies, list):
+                items = [(c["name"], c["value"]) for c in cookies
+                         if isinstance(c, dict) and "name" in c and "value" in c]
+            else:
+                items = cookies.items()
+            # Mask sensitive values for display
+            masked = {}
+            for key, value in items:
+                value = str(value)
+                if key == "sessionid":
+                    masked[key] = value[:8] + "..." + value[-4:] if len(value) > 12 else "***"
+                else:
+                    masked[key] = value[:20] + "..." if len(value) > 20 else value
+            payload = {"cookies": masked, "raw_count": len(cookies)}
+        except Exception:
+            pass
+        _masked_cache["mtime"] = mtime
+        _masked_cache["payload"] = payload
+    
+    payload = _masked_cache["payload"]
+    return {"cookies": dict(payload["cookies"]), "raw_count": payload["raw_count"]}
+
+
 @router.get("/admin-get-cookies")
 async def admin_get_cookies(token: str = ""):
     """Get current cookies (admin only, for display)."""
     if token not in _admin_sessions:
         raise HTTPException(status_code=401, detail="Unauthorized")
     
-    if os.path.exists(COOKIES_FILE):
-        try:
-            with open(COOKIES_FILE, "r") as f:
-                cookies = json.load(f)
-                # Mask sensitive values for display
-                masked = {}
-                for key, value in cookies.items():
-                    if key == "sessionid":
-                        masked[key] = value[:8] + "..." + value[-4:] if len(value) > 12 else "***"
-                    else:
-                        masked[key] = value[:20] + "..." if len(str(value)) > 20 else value
-                return {"cookies": masked, "raw_count": len(cookies)}
-        except:
-            pass
-    return {"cookies": {}, "raw_count": 0}
-
+    return await asyncio.to_thread(_read_masked_cookies)
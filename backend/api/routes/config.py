@@ -5,9 +5,15 @@ Config API route - allows frontend to fetch settings from server.
 from fastapi import APIRouter
 from pydantic import BaseModel
 from typing import List, Optional
-import json
+import asyncio
+import copy
+import logging
 import os
 
+from core import json_utils
+
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 # Config file path
@@ -36,31 +42,55 @@ DEFAULT_CONFIG = {
 }
 
 
+# Raw config file bytes, keyed by the file's mtime. Each load parses a fresh
+# copy from these (orjson when installed) - cheaper than deep-copying a dict
+_config_cache = {"mtime": None, "raw": None}
+
+
 def load_config() -> dict:
-    """Load config from file or return default."""
+    """Load config from file or return default.
+    
+    The file's contents are cached and only re-read when its mtime changes.
+    """
+    try:
+        st = os.stat(CONFIG_FILE)
+    except FileNotFoundError:
+        return copy.deepcopy(DEFAULT_CONFIG)
+    except Exception as e:
+        logger.warning("Config load error: %s", e)
+        return copy.deepcopy(DEFAULT_CONFIG)
+    
+    if _config_cache["mtime"] == st.st_mtime_ns:
+        return json_utils.loads(_config_cache["raw"])
+    
     try:
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, "r") as f:
-                return json.load(f)
+        with open(CONFIG_FILE, "rb") as f:
+            raw = f.read()
+        data = json_utils.loads(raw)
+        _config_cache["mtime"] = st.st_mtime_ns
+        _config_cache["raw"] = raw
+        return data
     except Exception as e:
-        print(f"Config load error: {e}")
+        logger.warning("Config load error: %s", e)
     
-    return DEFAULT_CONFIG.copy()
+    return copy.deepcopy(DEFAULT_CONFIG)
 
 
 def save_config(config: dict):
-    """Save config to file."""
+    """Save config to file (atomic replace)."""
     try:
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
+        json_utils.write_file(CONFIG_FILE, config, indent=True)
     except Exception as e:
-        print(f"Config save error: {e}")
+        logger.error("Config save error: %s", e)
+    finally:
+        # Force the next load to re-read the file
+        _config_cache["mtime"] = None
 
 
 @router.get("")
 async def get_config():
     """Get app configuration for frontend."""
-    return load_config()
+    return await asyncio.to_thread(load_config)
 
 
 class ConfigUpdate(BaseModel):
@@ -74,7 +104,7 @@ class ConfigUpdate(BaseModel):
 @router.patch("")
 async def update_config(updates: ConfigUpdate):
     """Update specific config values."""
-    config = load_config()
+    config = await asyncio.to_thread(load_config)
     
     if updates.proxy_mode is not None:
         config["proxy_mode"] = updates.proxy_mode
@@ -85,5 +115,5 @@ async def update_config(updates: ConfigUpdate):
     if updates.suggested_accounts is not None:
         config["suggested_accounts"] = updates.suggested_accounts
     
-    save_config(config)
+    await asyncio.to_thread(save_config, config)
     return config
@@ -3,9 +3,14 @@ from pydantic import BaseModel
 from core.download_service import download_service
 from fastapi.responses import FileResponse
 import os
+import re
 
 router = APIRouter()
 
+# yt-dlp writes downloads as "<id>.<ext>"; only these extensions are served
+DOWNLOAD_EXTENSIONS = ("mp4", "webm", "mkv", "mov")
+_VIDEO_ID_RE = re.compile(r'[A-Za-z0-9_-]{1,64}')
+
 class DownloadRequest(BaseModel):
     url: str
 
@@ -25,16 +30,18 @@ async def download_video(req: DownloadRequest):
 
 @router.get("/file/{video_id}")
 async def get_downloaded_file(video_id: str):
-    # Security risk: path traversal. MVP only.
-    # We need to find the file extension... or just allow the service to return the full path in the previous call
-    # Let's assume content content-disposition
-    # This is a bit tricky without knowing the extension.
-    # For MVP, we'll search the dir.
+    # Reject anything that isn't a plain ID so it can't escape the download dir
+    if not _VIDEO_ID_RE.fullmatch(video_id):
+        raise HTTPException(status_code=400, detail="Invalid video id")
     
-    download_dir = "downloads"
-    for filename in os.listdir(download_dir):
-        if filename.startswith(video_id):
-            return FileResponse(path=os.path.join(download_dir, filename), filename=filename)
+    # Files are named "<id>.<ext>", so probe the known extensions directly
+    # instead of scanning the whole directory
+    download_dir = download_service.download_dir
+    for ext in DOWNLOAD_EXTENSIONS:
+        filename = f"{video_id}.{ext}"
+        path = os.path.join(download_dir, filename)
+        if os.path.isfile(path):
+            return FileResponse(path=path, filename=filename)
             
     raise HTTPException(status_code=404, detail="File not found")
 
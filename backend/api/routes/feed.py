@@ -5,131 +5,326 @@ Feed API routes with LRU video cache for mobile optimization.
 from fastapi import APIRouter, Query, HTTPException, Request
 from fastapi.responses import StreamingResponse, FileResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Dict
 import httpx
+import logging
 import os
-import json
+import re
 import tempfile
 import asyncio
 import hashlib
+import heapq
 import time
 import shutil
+import threading
 
 from core.playwright_manager import PlaywrightManager
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+_VIDEO_ID_RE = re.compile(r'/video/(\d+)')
+_FULL_RANGE_RE = re.compile(r'bytes 0-(\d+)/(\d+)')
+
+# Shared CDN client - keeps TLS connections alive across proxy requests,
+# HTTP/2 lets range requests for the same video share one connection.
+# Closed from the app lifespan on shutdown.
+_cdn_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_cdn_client() -> httpx.AsyncClient:
+    """Shared CDN client, created on first use (inside the running loop)."""
+    global _cdn_client
+    
+    if _cdn_client is None or _cdn_client.is_closed:
+        _cdn_client = httpx.AsyncClient(
+            http2=True,
+            timeout=60.0,
+            follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+        )
+    return _cdn_client
+
+
+async def close_cdn_client():
+    """Close the shared CDN client (called on app shutdown)."""
+    global _cdn_client
+    
+    if _cdn_client is not None:
+        await _cdn_client.aclose()
+        _cdn_client = None
+
 # ========== LRU VIDEO CACHE ==========
 CACHE_DIR = os.path.join(tempfile.gettempdir(), "purestream_cache")
 MAX_CACHE_SIZE_MB = 500  # Limit cache to 500MB
 MAX_CACHE_FILES = 30     # Keep max 30 videos cached
 CACHE_TTL_HOURS = 2      # Videos expire after 2 hours
+CACHE_JANITOR_INTERVAL = CACHE_TTL_HOURS * 3600 / 12  # Background sweep period (seconds)
+
+# In-memory index of cached files so eviction and stats don't need to
+# rescan the directory. The heap holds (mtime, size, path) entries and may
+# contain stale entries for files that were touched or removed since they
+# were pushed; _cache_index is the source of truth for each live path.
+_cache_heap: list = []
+_cache_index: Dict[str, tuple] = {}  # path -> (mtime, size)
+_cache_total_bytes = 0
+# Cache helpers run in worker threads (asyncio.to_thread), so guard the index
+_cache_lock = threading.RLock()
 
 def init_cache():
     """Initialize cache directory."""
     os.makedirs(CACHE_DIR, exist_ok=True)
     cleanup_old_cache()
 
+# Prefix for cache filenames; bump it whenever the key scheme changes so
+# files written under an old scheme are never mistaken for current ones.
+CACHE_KEY_PREFIX = "b2_"
+
 def get_cache_key(url: str) -> str:
-    """Generate cache key from URL."""
-    return hashlib.md5(url.encode()).hexdigest()
+    """Generate cache key from URL (filename only, no security role)."""
+    return CACHE_KEY_PREFIX + hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+
+def rebuild_cache_index(expire_old: bool = False):
+    """
+    Populate the in-memory cache index from disk (one scandir pass).
+    With expire_old, files past the TTL are deleted instead of indexed.
+    """
+    global _cache_heap, _cache_total_bytes
+    
+    with _cache_lock:
+        _cache_heap = []
+        _cache_index.clear()
+        _cache_total_bytes = 0
+    
+        try:
+            it = os.scandir(CACHE_DIR)
+        except FileNotFoundError:
+            return
+    
+        now = time.time()
+        with it:
+            for entry in it:
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                
+                if expire_old and (now - stat.st_mtime) / 3600 > CACHE_TTL_HOURS:
+                    try:
+                        os.unlink(entry.path)
+                        logger.debug("CACHE: Expired %s", entry.name)
+                    except OSError:
+                        pass
+                    continue
+                
+                _cache_index[entry.path] = (stat.st_mtime, stat.st_size)
+                _cache_heap.append((stat.st_mtime, stat.st_size, entry.path))
+                _cache_total_bytes += stat.st_size
+    
+        heapq.heapify(_cache_heap)
+
+def _index_add(path: str, mtime: float, size: int):
+    """Record a (new or refreshed) cache file in the index."""
+    global _cache_total_bytes
+    
+    with _cache_lock:
+        previous = _cache_index.get(path)
+        if previous:
+            _cache_total_bytes -= previous[1]
+    
+        _cache_index[path] = (mtime, size)
+        _cache_total_bytes += size
+        heapq.heappush(_cache_heap, (mtime, size, path))
+    
+        # Touching files leaves stale heap entries behind; compact occasionally
+        if len(_cache_heap) > 2 * len(_cache_index) + MAX_CACHE_FILES:
+            _compact_heap()
+
+def _index_remove(path: str):
+    """Drop a cache file from the index (heap entry is invalidated lazily)."""
+    global _cache_total_bytes
+    
+    with _cache_lock:
+        entry = _cache_index.pop(path, None)
+        if entry:
+            _cache_total_bytes -= entry[1]
+
+def _compact_heap():
+    """Rebuild the heap from the index, discarding stale entries."""
+    global _cache_heap
+    
+    with _cache_lock:
+        _cache_heap = [(mtime, size, path) for path, (mtime, size) in _cache_index.items()]
+        heapq.heapify(_cache_heap)
 
 def get_cached_path(url: str) -> Optional[str]:
     """Check if video is cached and not expired."""
     cache_key = get_cache_key(url)
     cached_file = os.path.join(CACHE_DIR, f"{cache_key}.mp4")
     
-    if os.path.exists(cached_file):
-        # Check TTL
-        file_age_hours = (time.time() - os.path.getmtime(cached_file)) / 3600
-        if file_age_hours < CACHE_TTL_HOURS:
-            # Touch file to update LRU
-            os.utime(cached_file, None)
-            return cached_file
-        else:
-            # Expired, delete
-            os.unlink(cached_file)
+    try:
+        stat = os.stat(cached_file)
+    except FileNotFoundError:
+        return None
+    
+    # Check TTL
+    file_age_hours = (time.time() - stat.st_mtime) / 3600
+    if file_age_hours < CACHE_TTL_HOURS:
+        # Touch file to update LRU
+        os.utime(cached_file, None)
+        _index_add(cached_file, time.time(), stat.st_size)
+        return cached_file
     
+    # Expired, delete
+    os.unlink(cached_file)
+    _index_remove(cached_file)
     return None
 
 def save_to_cache(url: str, source_path: str) -> str:
-    """Save video to cache, return cached path."""
+    """Move a downloaded video (already inside CACHE_DIR) into place, return cached path."""
     cache_key = get_cache_key(url)
     cached_file = os.path.join(CACHE_DIR, f"{cache_key}.mp4")
     
-    # Copy to cache
-    shutil.copy2(source_path, cached_file)
-    
-    # Enforce cache limits
-    enforce_cache_limits()
+    # Atomic rename on the same filesystem - no second copy of the bytes
+    os.replace(source_path, cached_file)
+    stat = os.stat(cached_file)
+    _index_add(cached_file, stat.st_mtime, stat.st_size)
     
+    # Limits are enforced by the background janitor (see request_cache_eviction)
     return cached_file
 
 def enforce_cache_limits():
-    """Remove old files if cache exceeds limits."""
-    if not os.path.exists(CACHE_DIR):
-        return
-    
-    files = []
-    total_size = 0
-    
-    for f in os.listdir(CACHE_DIR):
-        fpath = os.path.join(CACHE_DIR, f)
-        if os.path.isfile(fpath):
-            stat = os.stat(fpath)
-            files.append((fpath, stat.st_mtime, stat.st_size))
-            total_size += stat.st_size
+    """Remove oldest files (via the in-memory heap) if cache exceeds limits."""
+    max_bytes = MAX_CACHE_SIZE_MB * 1024 * 1024
     
-    # Sort by modification time (oldest first)
-    files.sort(key=lambda x: x[1])
+    with _cache_lock:
+        while (len(_cache_index) > MAX_CACHE_FILES or _cache_total_bytes > max_bytes) and _cache_heap:
+            mtime, size, fpath = heapq.heappop(_cache_heap)
+        
+            # Skip stale entries (file was touched or already removed)
+            if _cache_index.get(fpath) != (mtime, size):
+                continue
+        
+            try:
+                os.unlink(fpath)
+                logger.debug("CACHE: Removed %s (LRU)", fpath)
+            except FileNotFoundError:
+                pass
+            except:
+                continue
+            _index_remove(fpath)
+
+def expire_cache_entries():
+    """Remove indexed files older than the TTL (no directory scan)."""
+    cutoff = time.time() - CACHE_TTL_HOURS * 3600
     
-    # Remove oldest until under limits
-    max_bytes = MAX_CACHE_SIZE_MB * 1024 * 1024
+    with _cache_lock:
+        expired = [path for path, (mtime, _) in _cache_index.items() if mtime < cutoff]
+        for fpath in expired:
+            try:
+                os.unlink(fpath)
+                logger.debug("CACHE: Expired %s", os.path.basename(fpath))
+            except FileNotFoundError:
+                pass
+            except:
+                continue
+            _index_remove(fpath)
+
+# Wakes the janitor early when a new file lands in the cache
+_cache_evict_event: Optional[asyncio.Event] = None
+
+def request_cache_eviction():
+    """Ask for cache limits to be enforced off the request path (call from the event loop)."""
+    if _cache_evict_event is not None:
+        _cache_evict_event.set()
+    else:
+        # Janitor not running - evict in a fire-and-forget worker thread
+        asyncio.get_running_loop().run_in_executor(None, enforce_cache_limits)
+
+async def cache_janitor():
+    """Background task: periodically expire old files and enforce cache limits."""
+    global _cache_evict_event
     
-    while (len(files) > MAX_CACHE_FILES or total_size > max_bytes) and files:
-        oldest = files.pop(0)
-        try:
-            os.unlink(oldest[0])
-            total_size -= oldest[2]
-            print(f"CACHE: Removed {oldest[0]} (LRU)")
-        except:
-            pass
+    _cache_evict_event = asyncio.Event()
+    try:
+        while True:
+            try:
+                await asyncio.wait_for(_cache_evict_event.wait(), timeout=CACHE_JANITOR_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            _cache_evict_event.clear()
+            
+            try:
+                await asyncio.to_thread(expire_cache_entries)
+                await asyncio.to_thread(enforce_cache_limits)
+            except Exception as e:
+                logger.warning("CACHE: Janitor error: %s", e)
+    finally:
+        _cache_evict_event = None
 
 def cleanup_old_cache():
-    """Remove expired files on startup."""
-    if not os.path.exists(CACHE_DIR):
-        return
-    
-    now = time.time()
-    for f in os.listdir(CACHE_DIR):
-        fpath = os.path.join(CACHE_DIR, f)
-        if os.path.isfile(fpath):
-            age_hours = (now - os.path.getmtime(fpath)) / 3600
-            if age_hours > CACHE_TTL_HOURS:
-                try:
-                    os.unlink(fpath)
-                    print(f"CACHE: Expired {f}")
-                except:
-                    pass
+    """Remove expired files on startup and index the survivors."""
+    rebuild_cache_index(expire_old=True)
 
 def get_cache_stats() -> dict:
-    """Get cache statistics."""
-    if not os.path.exists(CACHE_DIR):
-        return {"files": 0, "size_mb": 0}
-    
-    total = 0
-    count = 0
-    for f in os.listdir(CACHE_DIR):
-        fpath = os.path.join(CACHE_DIR, f)
-        if os.path.isfile(fpath):
-            total += os.path.getsize(fpath)
-            count += 1
-    
-    return {"files": count, "size_mb": round(total / 1024 / 1024, 2)}
+    """Get cache statistics (from the in-memory index)."""
+    with _cache_lock:
+        return {"files": len(_cache_index), "size_mb": round(_cache_total_bytes / 1024 / 1024, 2)}
 
 # Initialize cache on module load
 init_cache()
 
+async def stream_and_cache(r: httpx.Response, url: str):
+    """
+    Tee a CDN response: yield each chunk to the client while writing it to a
+    temp file in the cache dir. The file is only moved into place (as the
+    cache entry for url) on a clean, complete EOF; otherwise it's removed.
+    """
+    fd, part_path = tempfile.mkstemp(dir=CACHE_DIR, prefix=f"{get_cache_key(url)}.part.", suffix=".mp4")
+    expected = _decoded_length(r)
+    written = 0
+    completed = False
+    try:
+        with os.fdopen(fd, "wb") as cache_file:
+            async for chunk in r.aiter_bytes(chunk_size=64 * 1024):
+                cache_file.write(chunk)
+                written += len(chunk)
+                yield chunk
+        completed = expected is None or int(expected) == written
+    finally:
+        # Only release the connection - the client is shared
+        await r.aclose()
+        if completed:
+            await asyncio.to_thread(save_to_cache, url, part_path)
+            request_cache_eviction()
+            # Stats are only gathered when they'll be logged (they take the cache lock)
+            if logger.isEnabledFor(logging.DEBUG):
+                stats = get_cache_stats()
+                logger.debug("CACHED: %s... (%s files, %sMB total)", url[:50], stats["files"], stats["size_mb"])
+        elif os.path.exists(part_path):
+            os.unlink(part_path)
+
+def _decoded_length(r: httpx.Response) -> Optional[str]:
+    """
+    The CDN's Content-Length, if it is also the length of what aiter_bytes()
+    yields - with a Content-Encoding it only counts the encoded bytes.
+    """
+    if r.headers.get("Content-Encoding", "identity") != "identity":
+        return None
+    return r.headers.get("Content-Length")
+
+def _is_full_body(r: httpx.Response) -> bool:
+    """True if a CDN response carries the whole file (200, or a 206 for bytes 0-end)."""
+    if r.status_code == 200:
+        return True
+    if r.status_code == 206:
+        match = _FULL_RANGE_RE.fullmatch(r.headers.get("Content-Range", ""))
+        return bool(match) and int(match.group(1)) + 1 == int(match.group(2))
+    return False
+
 # ========== API ROUTES ==========
 
 from typing import Optional, Any, Union, List, Dict
@@ -147,13 +342,13 @@ async def get_feed(request: FeedRequest = None):
     
     if request and request.credentials:
         cookies, user_agent = PlaywrightManager.parse_json_credentials(request.credentials)
-        print(f"DEBUG: Using provided credentials ({len(cookies)} cookies)")
+        logger.debug("Using provided credentials (%d cookies)", len(cookies))
     
     try:
         videos = await PlaywrightManager.intercept_feed(cookies, user_agent)
         return videos
     except Exception as e:
-        print(f"DEBUG: Feed error: {e}")
+        logger.warning("Feed error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -176,7 +371,7 @@ async def get_feed_simple(fast: bool = False, skip_cache: bool = False):
         videos = await PlaywrightManager.intercept_feed(scroll_count=scroll_count)
         return videos
     except Exception as e:
-        print(f"DEBUG: Feed error: {e}")
+        logger.warning("Feed error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -189,14 +384,15 @@ async def cache_stats():
 @router.delete("/cache")
 async def clear_cache():
     """Clear video cache."""
-    if os.path.exists(CACHE_DIR):
-        shutil.rmtree(CACHE_DIR, ignore_errors=True)
-    os.makedirs(CACHE_DIR, exist_ok=True)
+    await asyncio.to_thread(shutil.rmtree, CACHE_DIR, ignore_errors=True)
+    await asyncio.to_thread(os.makedirs, CACHE_DIR, exist_ok=True)
+    await asyncio.to_thread(rebuild_cache_index)
     return {"status": "cleared"}
 
 
 @router.get("/proxy")
 async def proxy_video(
+    request: Request,
     url: str = Query(..., description="The TikTok video URL to proxy"),
     download: bool = Query(False, description="Force download with attachment header")
 ):
@@ -204,21 +400,22 @@ async def proxy_video(
     Proxy video with LRU caching for mobile optimization.
     OPTIMIZED: No server-side transcoding - client handles decoding.
     This reduces server CPU to ~0% during video playback.
+    On a cache miss the client's Range is forwarded to the CDN; full-body
+    replies are cached on the way through, partial ones are not.
     """
     import yt_dlp
-    import re
     
     # Check cache first
-    cached_path = get_cached_path(url)
+    cached_path = await asyncio.to_thread(get_cached_path, url)
     if cached_path:
-        print(f"CACHE HIT: {url[:50]}...")
+        logger.debug("CACHE HIT: %s...", url[:50])
         
         response_headers = {
             "Accept-Ranges": "bytes",
             "Cache-Control": "public, max-age=3600",
         }
         if download:
-            video_id_match = re.search(r'/video/(\d+)', url)
+            video_id_match = _VIDEO_ID_RE.search(url)
             video_id = video_id_match.group(1) if video_id_match else "tiktok_video"
             response_headers["Content-Disposition"] = f'attachment; filename="{video_id}.mp4"'
         
@@ -228,30 +425,23 @@ async def proxy_video(
             headers=response_headers
         )
     
-    print(f"CACHE MISS: {url[:50]}... (downloading)")
+    logger.debug("CACHE MISS: %s... (streaming)", url[:50])
     
     # Load stored credentials
-    cookies, user_agent = PlaywrightManager.load_stored_credentials()
-    
-    # Create temp file for download
-    temp_dir = tempfile.mkdtemp()
-    output_template = os.path.join(temp_dir, "video.%(ext)s")
+    cookies, user_agent = await PlaywrightManager.load_stored_credentials_async()
     
-    # Create cookies file for yt-dlp
-    cookie_file_path = None
+    # Cookies file contents for yt-dlp, built up front so the file itself is
+    # written with a single write() inside the worker thread below
+    cookie_text = None
     if cookies:
-        cookie_file = tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False)
-        cookie_file.write("# Netscape HTTP Cookie File\n")
-        for c in cookies:
-            cookie_file.write(f".tiktok.com\tTRUE\t/\tFALSE\t0\t{c['name']}\t{c['value']}\n")
-        cookie_file.close()
-        cookie_file_path = cookie_file.name
-    
-    # Download best quality - NO TRANSCODING (let client decode)
+        cookie_text = "# Netscape HTTP Cookie File\n" + "".join(
+            f".tiktok.com\tTRUE\t/\tFALSE\t0\t{c['name']}\t{c['value']}\n" for c in cookies
+        )
+    
+    # Resolve best quality direct URL - NO TRANSCODING (let client decode)
     # Prefer H.264 when available, but accept any codec
     ydl_opts = {
         'format': 'best[ext=mp4][vcodec^=avc]/best[ext=mp4]/best',
-        'outtmpl': output_template,
         'quiet': True,
         'no_warnings': True,
         'http_headers': {
@@ -260,61 +450,86 @@ async def proxy_video(
         }
     }
     
-    if cookie_file_path:
-        ydl_opts['cookiefile'] = cookie_file_path
-    
-    video_path = None
-    video_codec = "unknown"
+    def resolve_video():
+        # Per-request file: yt-dlp writes its cookie jar back to it on exit
+        cookie_file_path = None
+        opts = ydl_opts
+        if cookie_text:
+            fd, cookie_file_path = tempfile.mkstemp(suffix='.txt')
+            with os.fdopen(fd, 'w') as f:
+                f.write(cookie_text)
+            opts = {**ydl_opts, 'cookiefile': cookie_file_path}
+        try:
+            with yt_dlp.YoutubeDL(opts) as ydl:
+                info = ydl.extract_info(url, download=False)
+                direct_url = info.get('url')
+                if not direct_url:
+                    raise Exception("No direct media URL found")
+                headers = dict(info.get('http_headers') or {})
+                # The CDN needs the cookies yt-dlp picked up during extraction
+                cookie_header = ydl.cookiejar.get_cookie_header(direct_url)
+                if cookie_header:
+                    headers['Cookie'] = cookie_header
+                vcodec = info.get('vcodec', 'unknown') or 'unknown'
+                return direct_url, headers, vcodec
+        finally:
+            if cookie_file_path and os.path.exists(cookie_file_path):
+                os.unlink(cookie_file_path)
     
     try:
-        loop = asyncio.get_event_loop()
-        
-        def download_video():
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=True)
-                ext = info.get('ext', 'mp4')
-                vcodec = info.get('vcodec', 'unknown') or 'unknown'
-                return os.path.join(temp_dir, f"video.{ext}"), vcodec
-        
-        video_path, video_codec = await loop.run_in_executor(None, download_video)
-        
-        if not os.path.exists(video_path):
-            raise Exception("Video file not created")
-        
-        print(f"Downloaded codec: {video_codec} (no transcoding - client will decode)")
-        
-        # Save to cache directly - NO TRANSCODING
-        cached_path = save_to_cache(url, video_path)
-        stats = get_cache_stats()
-        print(f"CACHED: {url[:50]}... ({stats['files']} files, {stats['size_mb']}MB total)")
-        
+        direct_url, cdn_headers, video_codec = await asyncio.to_thread(resolve_video)
     except Exception as e:
-        print(f"DEBUG: yt-dlp download failed: {e}")
-        # Cleanup
-        if cookie_file_path and os.path.exists(cookie_file_path):
-            os.unlink(cookie_file_path)
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir, ignore_errors=True)
+        logger.warning("yt-dlp extraction failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Could not download video: {e}")
     
-    # Cleanup temp (cached file is separate)
-    if cookie_file_path and os.path.exists(cookie_file_path):
-        os.unlink(cookie_file_path)
-    shutil.rmtree(temp_dir, ignore_errors=True)
+    logger.debug("Resolved codec: %s (no transcoding - client will decode)", video_codec)
+    
+    # Seeking (and Safari/iOS <video>) needs 206 replies, so pass the Range on
+    client_range = request.headers.get("Range")
+    if client_range:
+        cdn_headers["Range"] = client_range
+    
+    try:
+        client = _get_cdn_client()
+        req = client.build_request("GET", direct_url, headers=cdn_headers)
+        r = await client.send(req, stream=True)
+        if r.status_code not in (200, 206):
+            await r.aclose()
+            raise Exception(f"CDN returned {r.status_code}")
+    except Exception as e:
+        logger.warning("CDN fetch failed: %s", e)
+        raise HTTPException(status_code=500, detail=f"Could not download video: {e}")
     
-    # Return from cache with codec info header
     response_headers = {
         "Accept-Ranges": "bytes",
         "Cache-Control": "public, max-age=3600",
         "X-Video-Codec": video_codec,  # Let client know the codec
     }
+    content_length = _decoded_length(r)
+    if content_length is not None:
+        response_headers["Content-Length"] = content_length
+    if "Content-Range" in r.headers:
+        response_headers["Content-Range"] = r.headers["Content-Range"]
     if download:
-        video_id_match = re.search(r'/video/(\d+)', url)
+        video_id_match = _VIDEO_ID_RE.search(url)
         video_id = video_id_match.group(1) if video_id_match else "tiktok_video"
         response_headers["Content-Disposition"] = f'attachment; filename="{video_id}.mp4"'
     
-    return FileResponse(
-        cached_path,
+    if _is_full_body(r):
+        body = stream_and_cache(r, url)
+    else:
+        async def stream_from_cdn():
+            try:
+                async for chunk in r.aiter_bytes(chunk_size=64 * 1024):
+                    yield chunk
+            finally:
+                # Only release the connection - the client is shared
+                await r.aclose()
+        body = stream_from_cdn()
+    
+    return StreamingResponse(
+        body,
+        status_code=r.status_code,
         media_type="video/mp4",
         headers=response_headers
     )
@@ -329,10 +544,23 @@ async def thin_proxy_video(
     """
     Thin proxy - just forwards CDN requests with proper headers.
     Supports Range requests for buffering and seeking.
+    Full-body responses are cached, so repeat fetches of the same CDN URL
+    are served from disk (FileResponse handles Range and uses sendfile).
     """
     
-    # Load stored credentials for headers
-    cookies, user_agent = PlaywrightManager.load_stored_credentials()
+    cached_path = await asyncio.to_thread(get_cached_path, cdn_url)
+    if cached_path:
+        return FileResponse(
+            cached_path,
+            media_type="video/mp4",
+            headers={
+                "Accept-Ranges": "bytes",
+                "Cache-Control": "public, max-age=3600",
+            }
+        )
+    
+    # Load stored credentials for headers (preformatted, cached by file mtime)
+    cookie_header, user_agent = await PlaywrightManager.get_cookie_header_async()
     
     headers = {
         "User-Agent": user_agent or PlaywrightManager.DEFAULT_USER_AGENT,
@@ -343,9 +571,8 @@ async def thin_proxy_video(
     }
     
     # Add cookies as header if available
-    if cookies:
-        cookie_str = "; ".join([f"{c['name']}={c['value']}" for c in cookies])
-        headers["Cookie"] = cookie_str
+    if cookie_header:
+        headers["Cookie"] = cookie_header
 
     # Forward Range header if present
     client_range = request.headers.get("Range")
@@ -353,11 +580,8 @@ async def thin_proxy_video(
         headers["Range"] = client_range
 
     try:
-        # Create client outside stream generator to access response headers first
-        client = httpx.AsyncClient(timeout=60.0, follow_redirects=True)
-        # We need to manually close this client later or use it in the generator
-        
         # Start the request to get headers (without reading body yet)
+        client = _get_cdn_client()
         req = client.build_request("GET", cdn_url, headers=headers)
         r = await client.send(req, stream=True)
 
@@ -366,8 +590,12 @@ async def thin_proxy_video(
                 async for chunk in r.aiter_bytes(chunk_size=64 * 1024):
                     yield chunk
             finally:
+                # Only release the connection - the client is shared
                 await r.aclose()
-                await client.aclose()
+        
+        # Whole file coming through: cache it on the way so later range
+        # requests for this URL are served from disk
+        body = stream_and_cache(r, cdn_url) if _is_full_body(r) else stream_from_cdn()
 
         response_headers = {
             "Accept-Ranges": "bytes",
@@ -376,21 +604,22 @@ async def thin_proxy_video(
         }
         
         # Forward Content-Length and Content-Range
-        if "Content-Length" in r.headers:
-            response_headers["Content-Length"] = r.headers["Content-Length"]
+        content_length = _decoded_length(r)
+        if content_length is not None:
+            response_headers["Content-Length"] = content_length
         if "Content-Range" in r.headers:
             response_headers["Content-Range"] = r.headers["Content-Range"]
             
         status_code = r.status_code
         
         return StreamingResponse(
-            stream_from_cdn(),
+            body,
             status_code=status_code,
             media_type="video/mp4",
             headers=response_headers
         )
 
     except Exception as e:
-        print(f"Thin proxy error: {e}")
+        logger.warning("Thin proxy error: %s", e)
         # Ensure cleanup if possible
         raise HTTPException(status_code=500, detail=str(e))
@@ -2,31 +2,72 @@
 Following API routes - manage followed creators.
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 import os
-import json
+import random
+import asyncio
+
+from core import json_utils
 
 router = APIRouter()
 
 FOLLOWING_FILE = "following.json"
 
+# Max creators scraped at once for the following feed (each one drives a browser)
+FOLLOWING_FEED_CONCURRENCY = int(os.getenv("FOLLOWING_FEED_CONCURRENCY", "8"))
+
 
 def load_following() -> list:
     """Load list of followed creators."""
     if os.path.exists(FOLLOWING_FILE):
         try:
-            with open(FOLLOWING_FILE, 'r') as f:
-                return json.load(f)
+            with open(FOLLOWING_FILE, 'rb') as f:
+                return json_utils.loads(f.read())
         except:
             return []
     return []
 
 
 def save_following(following: list):
-    """Save list of followed creators."""
-    with open(FOLLOWING_FILE, 'w') as f:
-        json.dump(following, f, indent=2)
+    """Save list of followed creators (atomic temp file + rename)."""
+    json_utils.write_file(FOLLOWING_FILE, following, indent=True)
+
+
+def _following_mtime():
+    """mtime_ns of the following file (None if missing)."""
+    try:
+        return os.stat(FOLLOWING_FILE).st_mtime_ns
+    except OSError:
+        return None
+
+
+# In-memory copy of the following list, stored as dict keys: keeps insertion
+# order for responses with O(1) membership, add and remove. Writes are
+# serialized. The file's mtime is recorded so outside edits are picked up.
+_following_loaded_mtime = _following_mtime()
+_following: dict = dict.fromkeys(load_following())
+_following_lock = asyncio.Lock()
+
+
+def _sync_following():
+    """Reload the in-memory list if following.json changed since we last read/wrote it."""
+    global _following_loaded_mtime
+    
+    mtime = _following_mtime()
+    if mtime == _following_loaded_mtime:
+        return
+    _following.clear()
+    _following.update(dict.fromkeys(load_following()))
+    _following_loaded_mtime = mtime
+
+
+async def _persist_following():
+    """Write the in-memory list to disk and remember the new mtime."""
+    global _following_loaded_mtime
+    
+    await asyncio.to_thread(save_following, list(_following))
+    _following_loaded_mtime = _following_mtime()
 
 
 class FollowRequest(BaseModel):
@@ -36,18 +77,22 @@ class FollowRequest(BaseModel):
 @router.get("")
 async def get_following():
     """Get list of followed creators."""
-    return load_following()
+    _sync_following()
+    return list(_following)
 
 
 @router.post("")
 async def add_following(request: FollowRequest):
     """Add a creator to following list."""
     username = request.username.lstrip('@')
-    following = load_following()
     
-    if username not in following:
-        following.append(username)
-        save_following(following)
+    async with _following_lock:
+        _sync_following()
+        # Already followed - nothing to write
+        if username not in _following:
+            _following[username] = None
+            await _persist_following()
+        following = list(_following)
     
     return {"status": "success", "following": following}
 
@@ -56,43 +101,58 @@ async def add_following(request: FollowRequest):
 async def remove_following(username: str):
     """Remove a creator from following list."""
     username = username.lstrip('@')
-    following = load_following()
     
-    if username in following:
-        following.remove(username)
-        save_following(following)
+    async with _following_lock:
+        _sync_following()
+        if username in _following:
+            del _following[username]
+            await _persist_following()
+        following = list(_following)
     
     return {"status": "success", "following": following}
 
 
 @router.get("/feed")
-async def get_following_feed(limit_per_user: int = 5):
+async def get_following_feed(limit_per_user: int = 5, max_items: int = Query(100, ge=1)):
     """
     Get a combined feed of videos from all followed creators.
     """
     from core.playwright_manager import PlaywrightManager
-    import asyncio
+    from api.routes.user import fetch_user_videos
     
-    following = load_following()
+    _sync_following()
+    following = list(_following)
     if not following:
         return []
     
-    # Load stored credentials
-    cookies, user_agent = PlaywrightManager.load_stored_credentials()
+    # Load stored credentials (file read kept off the event loop)
+    cookies, user_agent = await asyncio.to_thread(PlaywrightManager.load_stored_credentials)
     
     if not cookies:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    tasks = [PlaywrightManager.fetch_user_videos(user, cookies, user_agent, limit_per_user) for user in following]
+    sem = asyncio.Semaphore(FOLLOWING_FEED_CONCURRENCY)
+    
+    async def fetch_one(user: str):
+        async with sem:
+            # Direct TikTok API, with Playwright fallback
+            return await fetch_user_videos(user, limit_per_user)
+    
+    tasks = [fetch_one(user) for user in following]
     results = await asyncio.gather(*tasks, return_exceptions=True)
     
-    all_videos = []
+    # Merge by id - a duet or collab shows up in more than one creator's list
+    merged = {}
     for result in results:
         if isinstance(result, list):
-            all_videos.extend(result)
-    
-    # Shuffle results to make it look like a feed
-    import random
-    random.shuffle(all_videos)
+            for video in result:
+                merged.setdefault(video.get("id"), video)
+    merged.pop(None, None)
+    all_videos = list(merged.values())
     
-    return all_videos
+    # Shuffle results to make it look like a feed; when there are more than
+    # max_items, sample straight into a shuffled list of that size
+    if len(all_videos) <= max_items:
+        random.shuffle(all_videos)
+        return all_videos
+    return random.sample(all_videos, max_items)
@@ -3,14 +3,61 @@ User profile API - fetch real TikTok user data.
 """
 
 from fastapi import APIRouter, Query, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Mapping, Dict
+from collections import Counter
+from types import MappingProxyType
 import httpx
 import asyncio
+import logging
+import os
+import time
+from urllib.parse import quote
+from cachetools import TTLCache
 
+from core import json_utils
 from core.playwright_manager import PlaywrightManager
+from core.rate_limit import limiter_for
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Shared client for TikTok's JSON API - reuses keep-alive connections
+# instead of a new TCP+TLS handshake per call. Closed from the app lifespan.
+# The pool is sized for the /profiles and /suggested fan-out (up to 20
+# concurrent lookups per request), so parallel calls don't queue on it;
+# with HTTP/2 those lookups multiplex over a single connection.
+_api_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Shared TikTok API client, created on first use (inside the running loop)."""
+    global _api_client
+    
+    if _api_client is None or _api_client.is_closed:
+        _api_client = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            follow_redirects=True,
+            limits=httpx.Limits(max_keepalive_connections=100, max_connections=200, keepalive_expiry=60),
+        )
+    return _api_client
+
+
+# All calls to TikTok's JSON API share one token bucket, so bursts from
+# concurrent requests are smoothed out instead of tripping 429s
+_tiktok_limiter = limiter_for("www.tiktok.com")
+
+
+async def close_api_client():
+    """Close the shared TikTok API client (called on app shutdown)."""
+    global _api_client
+    
+    if _api_client is not None:
+        await _api_client.aclose()
+        _api_client = None
 
 
 class UserProfile(BaseModel):
@@ -25,84 +72,295 @@ class UserProfile(BaseModel):
     verified: bool = False
 
 
-@router.get("/profile")
-async def get_user_profile(username: str = Query(..., description="TikTok username (without @)")):
+# Read-only API header template, rebuilt only when the credentials change
+_headers_cache = {"key": None, "headers": None}
+
+
+def _api_headers() -> Optional[Mapping[str, str]]:
     """
-    Fetch real TikTok user profile data.
+    TikTok API request headers from stored credentials (None if not logged in).
+    Returns a shared read-only mapping; use {**headers, ...} for overrides.
     """
-    username = username.replace("@", "")
+    # Load stored credentials (preformatted cookie header)
+    cookie_str, user_agent = PlaywrightManager.get_cookie_header()
     
-    # Load stored credentials
-    cookies, user_agent = PlaywrightManager.load_stored_credentials()
-    
-    if not cookies:
-        raise HTTPException(status_code=401, detail="Not authenticated")
+    if not cookie_str:
+        return None
     
-    # Build cookie header
-    cookie_str = "; ".join([f"{c['name']}={c['value']}" for c in cookies])
-    
-    headers = {
-        "User-Agent": user_agent or PlaywrightManager.DEFAULT_USER_AGENT,
-        "Referer": "https://www.tiktok.com/",
-        "Cookie": cookie_str,
-        "Accept": "application/json",
-    }
+    key = (cookie_str, user_agent)
+    if _headers_cache["key"] != key:
+        _headers_cache["headers"] = MappingProxyType({
+            "User-Agent": user_agent or PlaywrightManager.DEFAULT_USER_AGENT,
+            "Referer": "https://www.tiktok.com/",
+            "Cookie": cookie_str,
+            "Accept": "application/json",
+            # br is left out: httpx only decodes it when brotli is installed
+            "Accept-Encoding": "gzip, deflate",
+        })
+        _headers_cache["key"] = key
+    return _headers_cache["headers"]
+
+
+async def _get_api_headers() -> Optional[Mapping[str, str]]:
+    """_api_headers(), with the credential file read done off the event loop on a cache miss."""
+    if PlaywrightManager.credentials_cached():
+        return _api_headers()
+    return await asyncio.to_thread(_api_headers)
+
+
+# In-flight upstream lookups, so concurrent requests for the same key share one call
+_inflight: dict = {}
+
+
+async def _single_flight(key: str, coro_factory):
+    """Run coro_factory() once per key at a time; concurrent callers await the same task."""
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(coro_factory())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shield so one caller giving up doesn't cancel the lookup for the others
+    return await asyncio.shield(task)
+
+
+# Recently fetched profiles - counts only move every few minutes
+_profile_cache: TTLCache = TTLCache(maxsize=10_000, ttl=120)
+
+
+async def _fetch_profile(client: httpx.AsyncClient, username: str, headers: Mapping[str, str]) -> UserProfile:
+    """
+    Fetch one profile, served from the short-lived cache when possible and
+    sharing the upstream call with concurrent lookups of the same user.
+    """
+    key = username.lower()
+    cached = _profile_cache.get(key)
+    if cached is not None:
+        return cached
     
-    # Try to fetch user data from TikTok's internal API
+    profile = await _single_flight(
+        f"profile:{key}",
+        lambda: _request_profile(client, username, headers)
+    )
+    # Only cache real data, not the basic fallback returned on errors
+    if profile.nickname is not None or profile.avatar is not None:
+        _profile_cache[key] = profile
+    return profile
+
+
+async def _request_profile(client: httpx.AsyncClient, username: str, headers: Mapping[str, str]) -> UserProfile:
+    """Fetch one profile from TikTok's internal API, falling back to basic info."""
     profile_url = f"https://www.tiktok.com/api/user/detail/?uniqueId={username}"
     
     try:
-        async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as client:
+        async with _tiktok_limiter:
             response = await client.get(profile_url, headers=headers)
-            
-            if response.status_code != 200:
-                # Fallback - return basic info
-                return UserProfile(username=username)
-            
-            data = response.json()
-            user_info = data.get("userInfo", {})
-            user = user_info.get("user", {})
-            stats = user_info.get("stats", {})
-            
-            return UserProfile(
-                username=username,
-                nickname=user.get("nickname"),
-                avatar=user.get("avatarLarger") or user.get("avatarMedium"),
-                bio=user.get("signature"),
-                followers=stats.get("followerCount"),
-                following=stats.get("followingCount"),
-                likes=stats.get("heartCount"),
-                verified=user.get("verified", False)
-            )
-            
+        
+        if response.status_code != 200:
+            # Fallback - return basic info
+            return UserProfile(username=username)
+        
+        data = json_utils.loads(response.content)
+        user_info = data.get("userInfo", {})
+        user = user_info.get("user", {})
+        stats = user_info.get("stats", {})
+        
+        return UserProfile(
+            username=username,
+            nickname=user.get("nickname"),
+            avatar=user.get("avatarLarger") or user.get("avatarMedium"),
+            bio=user.get("signature"),
+            followers=stats.get("followerCount"),
+            following=stats.get("followingCount"),
+            likes=stats.get("heartCount"),
+            verified=user.get("verified", False)
+        )
+        
     except Exception as e:
-        print(f"Error fetching profile for {username}: {e}")
+        logger.warning("Error fetching profile for %s: %s", username, e)
         # Return basic fallback
         return UserProfile(username=username)
 
 
-@router.get("/profiles")
-async def get_multiple_profiles(usernames: str = Query(..., description="Comma-separated usernames")):
+@router.get("/profile")
+async def get_user_profile(username: str = Query(..., description="TikTok username (without @)")):
     """
-    Fetch multiple TikTok user profiles at once.
+    Fetch real TikTok user profile data.
     """
+    username = username.replace("@", "")
+    
+    headers = await _get_api_headers()
+    if headers is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    return await _fetch_profile(_get_client(), username, headers)
+
+
+def _parse_usernames(usernames: str) -> List[str]:
+    """Split a comma-separated username list (max 20)."""
     username_list = [u.strip().replace("@", "") for u in usernames.split(",") if u.strip()]
     
     if len(username_list) > 20:
         raise HTTPException(status_code=400, detail="Max 20 usernames at once")
     
-    # Fetch all profiles concurrently
-    tasks = [get_user_profile(u) for u in username_list]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    return username_list
+
+
+@router.get("/profiles")
+async def get_multiple_profiles(usernames: str = Query(..., description="Comma-separated usernames")):
+    """
+    Fetch multiple TikTok user profiles at once.
+    """
+    username_list = _parse_usernames(usernames)
     
-    profiles = []
-    for i, result in enumerate(results):
-        if isinstance(result, Exception):
-            profiles.append(UserProfile(username=username_list[i]))
-        else:
-            profiles.append(result)
+    # Build credentials/headers once for the whole batch
+    headers = await _get_api_headers()
+    if headers is None:
+        return [UserProfile(username=u) for u in username_list]
+    
+    # Fetch each distinct profile once, concurrently on the shared client
+    client = _get_client()
+    unique = list(dict.fromkeys(username_list))
+    results = await asyncio.gather(*[_fetch_profile(client, u, headers) for u in unique], return_exceptions=True)
+    
+    by_name = {}
+    for username, result in zip(unique, results):
+        by_name[username] = UserProfile(username=username) if isinstance(result, Exception) else result
+    
+    # Same order (and repeats) as requested
+    return [by_name[u] for u in username_list]
+
+
+@router.get("/profiles/stream")
+async def stream_multiple_profiles(usernames: str = Query(..., description="Comma-separated usernames")):
+    """
+    Like /profiles, but streams newline-delimited JSON, one profile per line
+    in completion order, so the UI can render each as soon as it arrives.
+    """
+    username_list = _parse_usernames(usernames)
+    headers = await _get_api_headers()
+    
+    async def generate():
+        if headers is None:
+            for u in username_list:
+                yield json_utils.dumps(jsonable_encoder(UserProfile(username=u))) + b"\n"
+            return
+        
+        # One lookup per distinct username; repeats get the same line again
+        counts = Counter(username_list)
+        
+        async def fetch(u: str):
+            return u, await _fetch_profile(_get_client(), u, headers)
+        
+        tasks = [asyncio.ensure_future(fetch(u)) for u in counts]
+        try:
+            for future in asyncio.as_completed(tasks):
+                username, profile = await future
+                yield (json_utils.dumps(jsonable_encoder(profile)) + b"\n") * counts[username]
+        finally:
+            # Client went away - don't leave lookups running
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+# Set FORCE_PLAYWRIGHT=1 to skip the direct API and always scrape with a
+# browser (e.g. when TikTok starts rejecting unsigned API calls)
+FORCE_PLAYWRIGHT = os.getenv("FORCE_PLAYWRIGHT", "").lower() in ("1", "true", "yes")
+
+
+def _extract_videos(items: list, limit: int) -> list:
+    """Turn raw TikTok API items into video dicts (deduped, at most limit)."""
+    # Search results wrap each video as {"type": 1, "item": {...}}
+    unwrapped = (
+        item["item"] if isinstance(item, dict) and isinstance(item.get("item"), dict) else item
+        for item in items
+    )
+    # Same id-keyed capture as the browser scrapes: repeats skip the extraction
+    videos: dict = {}
+    PlaywrightManager._capture_items(unwrapped, videos, limit)
+    return list(videos.values())
+
+
+async def _api_user_videos(username: str, limit: int, headers: Mapping[str, str]) -> list:
+    """Fetch a user's videos straight from TikTok's JSON API (no browser)."""
+    async with _tiktok_limiter:
+        detail = await _get_client().get(
+            f"https://www.tiktok.com/api/user/detail/?uniqueId={username}", headers=headers
+        )
+    if detail.status_code != 200:
+        return []
+    user = json_utils.loads(detail.content).get("userInfo", {}).get("user", {})
+    sec_uid = user.get("secUid")
+    if not sec_uid:
+        return []
     
-    return profiles
+    async with _tiktok_limiter:
+        response = await _get_client().get(
+            f"https://www.tiktok.com/api/post/item_list/?secUid={quote(sec_uid)}&count={min(limit, 35)}&cursor=0",
+            headers=headers
+        )
+    if response.status_code != 200 or not response.content:
+        return []
+    data = json_utils.loads(response.content)
+    return _extract_videos(data.get("itemList") or [], limit)
+
+
+# Static parts of the search API URL; only the keyword and offset vary
+_SEARCH_URL_PREFIX = "https://www.tiktok.com/api/search/general/full/?from_page=search&keyword="
+_SEARCH_URL_OFFSET = "&offset="
+
+
+async def _api_search_videos(query: str, limit: int, cursor: int, headers: Mapping[str, str]) -> list:
+    """Search videos straight from TikTok's JSON API (no browser)."""
+    search_url = _SEARCH_URL_PREFIX + quote(query, safe="") + _SEARCH_URL_OFFSET + str(cursor)
+    async with _tiktok_limiter:
+        response = await _get_client().get(search_url, headers=headers)
+    if response.status_code != 200 or not response.content:
+        return []
+    data = json_utils.loads(response.content)
+    return _extract_videos(data.get("data") or data.get("item_list") or [], limit)
+
+
+async def fetch_user_videos(username: str, limit: int) -> list:
+    """
+    Fetch a user's videos: direct API first, Playwright scrape as fallback
+    (or always, with FORCE_PLAYWRIGHT). Returns [] when not authenticated.
+    Concurrent calls for the same user and limit - the /videos route and a
+    following-feed refresh, say - share one fetch.
+    Results from either path are kept in PlaywrightManager's 90s
+    per-creator cache, keyed by (username, limit), so refreshes and profile
+    re-opens within the TTL make no TikTok calls at all.
+    """
+    cached = PlaywrightManager.get_cached_user_videos(username, limit)
+    if cached is not None:
+        logger.debug("Using cached videos for @%s", username)
+        return cached
+    
+    videos = await _single_flight(
+        f"videos:{username.lower()}:{limit}",
+        lambda: _fetch_user_videos(username, limit)
+    )
+    PlaywrightManager.cache_user_videos(username, limit, videos)
+    return videos
+
+
+async def _fetch_user_videos(username: str, limit: int) -> list:
+    headers = await _get_api_headers()
+    if headers is None:
+        return []
+    
+    if not FORCE_PLAYWRIGHT:
+        try:
+            videos = await _api_user_videos(username, limit, headers)
+            if videos:
+                return videos
+            logger.info("Direct API returned no videos for @%s, falling back to Playwright", username)
+        except Exception as e:
+            logger.warning("Direct API failed for @%s: %s, falling back to Playwright", username, e)
+    
+    cookies, user_agent = await PlaywrightManager.load_stored_credentials_async()
+    return await PlaywrightManager.fetch_user_videos(username, cookies, user_agent, limit)
 
 
 @router.get("/videos")
@@ -112,26 +370,43 @@ async def get_user_videos(
 ):
     """
     Fetch videos from a TikTok user's profile.
-    Uses Playwright to crawl the user's page for reliable results.
+    Uses TikTok's JSON API, falling back to a Playwright crawl of the user's page.
     """
     username = username.replace("@", "")
     
-    # Load stored credentials
-    cookies, user_agent = PlaywrightManager.load_stored_credentials()
-    
-    if not cookies:
+    if await _get_api_headers() is None:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    print(f"Fetching videos for @{username}...")
+    logger.info("Fetching videos for @%s...", username)
     
     try:
-        videos = await PlaywrightManager.fetch_user_videos(username, cookies, user_agent, limit)
-        return {"username": username, "videos": videos, "count": len(videos)}
+        videos = await fetch_user_videos(username, limit)
+        return json_utils.JSONResponse({"username": username, "videos": videos, "count": len(videos)})
     except Exception as e:
-        print(f"Error fetching videos for {username}: {e}")
+        logger.error("Error fetching videos for %s: %s", username, e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Recent search results keyed by (query, limit, cursor) - trending queries
+# repeat a lot, and results barely move within a few minutes
+_search_cache: TTLCache = TTLCache(maxsize=512, ttl=300)
+
+
+async def _search(query: str, limit: int, cursor: int, headers: Mapping[str, str]) -> list:
+    """Search via the JSON API, falling back to a Playwright crawl of the search page."""
+    videos = []
+    if not FORCE_PLAYWRIGHT:
+        try:
+            videos = await _api_search_videos(query, limit, cursor, headers)
+        except Exception as e:
+            logger.warning("Direct search API failed for %s: %s, falling back to Playwright", query, e)
+    
+    if not videos:
+        cookies, user_agent = await PlaywrightManager.load_stored_credentials_async()
+        videos = await PlaywrightManager.search_videos(query, cookies, user_agent, limit, cursor)
+    return videos
+
+
 @router.get("/search")
 async def search_videos(
     query: str = Query(..., description="Search keyword or hashtag"),
@@ -140,31 +415,64 @@ async def search_videos(
 ):
     """
     Search for videos by keyword or hashtag.
-    Uses Playwright to crawl TikTok search results for reliable data.
+    Uses TikTok's JSON API, falling back to a Playwright crawl of the search page.
     """
-    # Load stored credentials
-    cookies, user_agent = PlaywrightManager.load_stored_credentials()
-    
-    if not cookies:
+    headers = await _get_api_headers()
+    if headers is None:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    print(f"Searching for: {query} (limit={limit}, cursor={cursor})...")
+    key = (query.strip().lower(), limit, cursor)
+    videos = _search_cache.get(key)
+    if videos is not None:
+        logger.debug("Returning cached search results for: %s", query)
+        return json_utils.JSONResponse({"query": query, "videos": videos, "count": len(videos), "cursor": cursor + len(videos)})
+    
+    logger.info("Searching for: %s (limit=%d, cursor=%d)...", query, limit, cursor)
     
     try:
-        videos = await PlaywrightManager.search_videos(query, cookies, user_agent, limit, cursor)
-        return {"query": query, "videos": videos, "count": len(videos), "cursor": cursor + len(videos)}
+        # Identical concurrent searches share one upstream call / browser scrape
+        videos = await _single_flight(
+            f"search:{key}",
+            lambda: _search(query, limit, cursor, headers)
+        )
+        # Don't cache empty results - usually a failed or blocked scrape
+        if videos:
+            _search_cache[key] = videos
+        
+        return json_utils.JSONResponse({"query": query, "videos": videos, "count": len(videos), "cursor": cursor + len(videos)})
     except Exception as e:
-        print(f"Error searching for {query}: {e}")
+        logger.error("Error searching for %s: %s", query, e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# Cache for suggested accounts
-_suggested_cache = {
-    "accounts": [],
-    "updated_at": 0
-}
+# Suggested accounts cached per one-hour time bucket: int(time.time() // CACHE_TTL)
+# maps to the fetch task, so concurrent requests share one in-flight fetch and
+# a new bucket simply starts a new one. Older buckets are dropped.
+_suggested_buckets: Dict[int, asyncio.Task] = {}
 CACHE_TTL = 3600  # 1 hour cache
 
+# Enriched static fallback list, keyed by how many accounts were enriched.
+# Used while the dynamic fetch keeps coming up short, so it isn't redone
+# (one API call per account) on every request.
+_fallback_cache: TTLCache = TTLCache(maxsize=4, ttl=CACHE_TTL)
+
+
+async def _fetch_suggested(cookies: list, user_agent: str, limit: int) -> list:
+    """Fetch suggested accounts from TikTok ([] if the dynamic fetch came up short)."""
+    accounts = await PlaywrightManager.fetch_suggested_accounts(cookies, user_agent, limit)
+    # Need at least 5 accounts from dynamic fetch
+    if accounts and len(accounts) >= 5:
+        return accounts
+    return []
+
+
+def _cached_suggested(bucket: int) -> list:
+    """Accounts from a finished, successful fetch in this bucket ([] if none)."""
+    task = _suggested_buckets.get(bucket)
+    if task is None or not task.done() or task.cancelled() or task.exception() is not None:
+        return []
+    return task.result()
+
 
 @router.get("/suggested")
 async def get_suggested_accounts(
@@ -174,83 +482,92 @@ async def get_suggested_accounts(
     Fetch trending/suggested Vietnamese TikTok creators.
     Uses TikTok's discover API and caches results for 1 hour.
     """
-    import time
+    bucket = int(time.time() // CACHE_TTL)
     
     # Check cache
-    if _suggested_cache["accounts"] and (time.time() - _suggested_cache["updated_at"]) < CACHE_TTL:
-        print("Returning cached suggested accounts")
-        return {"accounts": _suggested_cache["accounts"][:limit], "cached": True}
+    accounts = _cached_suggested(bucket)
+    if accounts:
+        logger.info("Returning cached suggested accounts")
+        return json_utils.JSONResponse({"accounts": accounts[:limit], "cached": True})
     
     # Load stored credentials
-    cookies, user_agent = PlaywrightManager.load_stored_credentials()
+    cookies, user_agent = await PlaywrightManager.load_stored_credentials_async()
     
     if not cookies:
         # Return fallback static list if not authenticated
-        return {"accounts": get_fallback_accounts()[:limit], "cached": False, "fallback": True}
+        return json_utils.JSONResponse({"accounts": get_fallback_accounts()[:limit], "cached": False, "fallback": True})
     
-    print("Fetching fresh suggested accounts from TikTok...")
+    task = _suggested_buckets.get(bucket)
+    if task is None or task.done():
+        # No fetch yet in this bucket (or the last one failed) - start one
+        logger.info("Fetching fresh suggested accounts from TikTok...")
+        for old in [b for b in _suggested_buckets if b != bucket]:
+            del _suggested_buckets[old]
+        task = asyncio.ensure_future(_fetch_suggested(cookies, user_agent, limit))
+        _suggested_buckets[bucket] = task
     
     try:
-        accounts = await PlaywrightManager.fetch_suggested_accounts(cookies, user_agent, limit)
+        # Shield so a disconnecting client doesn't cancel the shared fetch
+        accounts = await asyncio.shield(task)
         
-        if accounts and len(accounts) >= 5:  # Need at least 5 accounts from dynamic fetch
-            _suggested_cache["accounts"] = accounts
-            _suggested_cache["updated_at"] = time.time()
-            return {"accounts": accounts[:limit], "cached": False}
+        if accounts:
+            return json_utils.JSONResponse({"accounts": accounts[:limit], "cached": False})
         else:
             # Fallback: fetch actual profile data with avatars for static list
-            print("Dynamic fetch failed, fetching profile data for static accounts...")
-            fallback_list = get_fallback_accounts()[:min(limit, 20)]  # Limit to 20 for speed
-            return await fetch_profiles_with_avatars(fallback_list, cookies, user_agent)
+            count = min(limit, 20)  # Limit to 20 for speed
+            enriched = _fallback_cache.get(count)
+            if enriched is None:
+                logger.info("Dynamic fetch failed, fetching profile data for static accounts...")
+                headers = await _get_api_headers()
+                enriched = await _single_flight(
+                    f"suggested-fallback:{count}",
+                    lambda: fetch_profiles_with_avatars(get_fallback_accounts()[:count], headers)
+                )
+                _fallback_cache[count] = enriched
+            return json_utils.JSONResponse(enriched)
             
     except Exception as e:
-        print(f"Error fetching suggested accounts: {e}")
-        return {"accounts": get_fallback_accounts()[:limit], "cached": False, "fallback": True}
+        logger.error("Error fetching suggested accounts: %s", e)
+        return json_utils.JSONResponse({"accounts": get_fallback_accounts()[:limit], "cached": False, "fallback": True})
 
 
-async def fetch_profiles_with_avatars(accounts: list, cookies: list, user_agent: str) -> dict:
-    """Fetch actual profile data with avatars for a list of accounts."""
-    
-    cookie_str = "; ".join([f"{c['name']}={c['value']}" for c in cookies])
+async def fetch_profiles_with_avatars(accounts: list, headers: Optional[Mapping[str, str]]) -> dict:
+    """Fetch actual profile data with avatars for a list of accounts (concurrently)."""
     
-    headers = {
-        "User-Agent": user_agent or PlaywrightManager.DEFAULT_USER_AGENT,
-        "Referer": "https://www.tiktok.com/",
-        "Cookie": cookie_str,
-        "Accept": "application/json",
-    }
+    client = _get_client()
+    sem = asyncio.Semaphore(16)
     
-    enriched = []
-    
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        for acc in accounts:
-            try:
-                url = f"https://www.tiktok.com/api/user/detail/?uniqueId={acc['username']}"
+    async def fetch_one(acc: dict) -> dict:
+        try:
+            url = f"https://www.tiktok.com/api/user/detail/?uniqueId={acc['username']}"
+            async with sem, _tiktok_limiter:
                 res = await client.get(url, headers=headers)
+            
+            if res.status_code == 200:
+                data = json_utils.loads(res.content)
+                user = data.get("userInfo", {}).get("user", {})
+                stats = data.get("userInfo", {}).get("stats", {})
                 
-                if res.status_code == 200:
-                    data = res.json()
-                    user = data.get("userInfo", {}).get("user", {})
-                    stats = data.get("userInfo", {}).get("stats", {})
+                if user:
+                    return {
+                        "username": acc["username"],
+                        "nickname": user.get("nickname") or acc.get("nickname", acc["username"]),
+                        "avatar": user.get("avatarThumb") or user.get("avatarMedium"),
+                        "followers": stats.get("followerCount", 0),
+                        "verified": user.get("verified", False),
+                        "region": "VN"
+                    }
                     
-                    if user:
-                        enriched.append({
-                            "username": acc["username"],
-                            "nickname": user.get("nickname") or acc.get("nickname", acc["username"]),
-                            "avatar": user.get("avatarThumb") or user.get("avatarMedium"),
-                            "followers": stats.get("followerCount", 0),
-                            "verified": user.get("verified", False),
-                            "region": "VN"
-                        })
-                        continue
-                        
-            except Exception as e:
-                print(f"Error fetching profile for {acc['username']}: {e}")
-            
-            # Fallback: use original data without avatar
-            enriched.append(acc)
+        except Exception as e:
+            logger.warning("Error fetching profile for %s: %s", acc['username'], e)
+        
+        # Fallback: use original data without avatar
+        return acc
+    
+    # gather keeps the input order
+    enriched = await asyncio.gather(*(fetch_one(acc) for acc in accounts))
     
-    return {"accounts": enriched, "cached": False, "enriched": True}
+    return {"accounts": list(enriched), "cached": False, "enriched": True}
 
 
 def get_fallback_accounts():
@@ -0,0 +1,95 @@
+"""
+Gzip response compression that leaves streamed and media responses alone.
+
+Starlette's GZipMiddleware also compresses streaming responses, and it never
+flushes between chunks, so a line-by-line stream (NDJSON, server-sent events)
+sits in the zlib buffer until the response ends. Which responses to skip is
+decided here from the response's own headers, so it works the same on every
+Starlette version.
+"""
+
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+# Streamed line by line - each chunk must reach the client as it is sent
+STREAMING_CONTENT_TYPES = frozenset({"application/x-ndjson", "text/event-stream"})
+# Already compressed, and range requests have to line up with the raw bytes
+MEDIA_TYPE_PREFIXES = ("video/", "audio/", "image/")
+
+
+class GZipMiddleware:
+    """
+    Gzip responses of at least minimum_size bytes for clients that accept it.
+    Responses are sent as-is when they are streaming or media types, have a
+    Content-Encoding already, or are partial (206), and so is everything
+    under exclude_paths (prefixes).
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, compresslevel: int = 6, exclude_paths: tuple = ()):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self.exclude_paths = tuple(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["path"].startswith(self.exclude_paths)
+                or "gzip" not in Headers(scope=scope).get("accept-encoding", "")):
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+        compressor = None
+
+        async def send_wrapper(message):
+            nonlocal start, passthrough, compressor
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                content_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+                passthrough = (
+                    "content-encoding" in headers
+                    or message["status"] == 206
+                    or content_type in STREAMING_CONTENT_TYPES
+                    or content_type.startswith(MEDIA_TYPE_PREFIXES)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    # Held back until the first body chunk shows whether to compress
+                    start = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+                data = compressor.compress(body)
+                if not more_body:
+                    data += compressor.flush()
+                headers = MutableHeaders(raw=start["headers"])
+                headers["Content-Encoding"] = "gzip"
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(data))
+                await send(start)
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            data = compressor.compress(body)
+            if not more_body:
+                data += compressor.flush()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
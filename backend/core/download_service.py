@@ -19,12 +19,10 @@ class DownloadService:
             'quiet': True,
         }
 
-        loop = asyncio.get_event_loop()
-        
         # Run synchronous yt-dlp in a separate thread
         try:
              with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = await loop.run_in_executor(None, lambda: ydl.extract_info(url, download=True))
+                info = await asyncio.to_thread(ydl.extract_info, url, download=True)
                 filename = ydl.prepare_filename(info)
                 return {
                     "status": "success",
@@ -2,13 +2,45 @@ from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig, CacheMode
 from crawl4ai.extraction_strategy import LLMExtractionStrategy
 from pydantic import BaseModel, Field
 import os
-import json
+import re
 import asyncio
+import functools
+import logging
+import concurrent.futures
+import itertools
+from pathlib import Path
 from typing import List, Optional
 import yt_dlp
 from cachetools import TTLCache
 import time
 
+from core import json_utils
+
+logger = logging.getLogger(__name__)
+
+# Set PURESTREAM_DEBUG_HTML=1 to dump each crawled page to debug_tiktok.html
+DEBUG_HTML = os.getenv("PURESTREAM_DEBUG_HTML") == "1"
+
+# TikTok uses relative URLs like /@username/video/1234567890
+_VIDEO_LINK_RE = re.compile(r'/@([a-zA-Z0-9_.]+)/video/(\d+)')
+
+
+@functools.lru_cache(maxsize=8)
+def _video_link_re_excluding(author: str) -> re.Pattern:
+    """_VIDEO_LINK_RE, but a negative lookahead skips links by `author` inside the regex engine."""
+    return re.compile(r'/@(?!' + re.escape(author) + r'/)([a-zA-Z0-9_.]+)/video/(\d+)')
+
+_SIGI_STATE_TAG = '<script id="SIGI_STATE" type="application/json">'
+
+# yt-dlp options shared by every URL resolve; only http_headers varies per feed
+_YDL_BASE_OPTS = {
+    'quiet': True,
+    'no_warnings': True,
+    'format': 'best',
+    'http_headers': None,
+    'socket_timeout': 10,
+}
+
 class VideoSchema(BaseModel):
     url: str = Field(..., description="The URL to the video content")
     description: str = Field(..., description="The video caption/description")
@@ -19,6 +51,28 @@ class FeedService:
     _feed_cache: TTLCache = TTLCache(maxsize=10, ttl=60)
     _browser_warmed_up: bool = False
     _persistent_session_id: str = "tiktok_feed_session"
+    # Parsed JSON files: path -> (mtime_ns, data). cookies.json and
+    # session_metadata.json are read for every resolved URL, so only
+    # re-parse them when they change on disk.
+    _json_files: dict = {}
+    # Crawler cookie list and Cookie header derived from the parsed cookies.json,
+    # rebuilt only when _load_json hands back a new dict (i.e. the file changed)
+    _cookie_derived: dict = {"source": None, "crawl_cookies": [], "header": ""}
+    # yt-dlp resolves are blocking; run them on their own small pool (so they
+    # don't starve the default executor) and cap how many run at once.
+    _resolve_sem = asyncio.Semaphore(8)
+    _resolve_executor = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="ytdlp")
+    # One long-lived crawler (and Chromium) for the process instead of a launch
+    # per get_feed. Relaunched only when the cookies/user agent it was started
+    # with change, or after a failed crawl. Closed via close_crawler() on shutdown.
+    _crawler: Optional[AsyncWebCrawler] = None
+    _crawler_key: Optional[tuple] = None
+    _crawler_lock = asyncio.Lock()
+    # Every crawl drives the same crawl4ai session (_persistent_session_id),
+    # i.e. the same browser page, so crawls take turns: a concurrent one would
+    # navigate the page out from under the other, or relaunch the crawler
+    # mid-crawl when its cookies differ
+    _crawl_lock = asyncio.Lock()
 
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
@@ -28,7 +82,7 @@ class FeedService:
         if FeedService._browser_warmed_up:
             return
         
-        print("DEBUG: Warming up browser session...")
+        logger.info("Warming up browser session...")
         try:
             browser_config = BrowserConfig(headless=True, java_script_enabled=True)
             run_config = CrawlerRunConfig(
@@ -39,91 +93,123 @@ class FeedService:
             async with AsyncWebCrawler(config=browser_config) as crawler:
                 await crawler.arun(url="https://www.tiktok.com", config=run_config)
             FeedService._browser_warmed_up = True
-            print("DEBUG: Browser session warmed up successfully!")
+            logger.info("Browser session warmed up successfully!")
         except Exception as e:
-            print(f"DEBUG: Warmup failed (non-critical): {e}")
+            logger.warning("Warmup failed (non-critical): %s", e)
 
-    async def _resolve_video_url(self, url: str) -> Optional[str]:
-        """Resolve direct media URL using yt-dlp."""
-        cookie_header = ""
-        user_agent = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36"
-        
-        if os.path.exists("cookies.json"):
+    @classmethod
+    async def _get_crawler(cls, browser_config: BrowserConfig, key: tuple) -> AsyncWebCrawler:
+        """Shared started crawler for this browser config, launching it on first use."""
+        async with cls._crawler_lock:
+            if cls._crawler is not None and cls._crawler_key != key:
+                await cls._close_crawler_locked()
+            if cls._crawler is None:
+                crawler = AsyncWebCrawler(config=browser_config)
+                await crawler.__aenter__()
+                cls._crawler = crawler
+                cls._crawler_key = key
+            return cls._crawler
+
+    @classmethod
+    async def _close_crawler_locked(cls):
+        crawler, cls._crawler, cls._crawler_key = cls._crawler, None, None
+        if crawler is not None:
             try:
-                with open("cookies.json", 'r') as f:
-                    cookies_dict = json.load(f)
-                    cookie_header = "; ".join([f"{k}={v}" for k, v in cookies_dict.items()])
+                await crawler.__aexit__(None, None, None)
             except Exception as e:
-                print(f"Error preparing cookies for yt-dlp: {e}")
+                logger.warning("Error closing crawler: %s", e)
 
-        if os.path.exists("session_metadata.json"):
-            try:
-                with open("session_metadata.json", "r") as f:
-                    meta = json.load(f)
-                    user_agent = meta.get("user_agent", user_agent)
-            except:
-                pass
+    @classmethod
+    async def close_crawler(cls, only: Optional[AsyncWebCrawler] = None):
+        """Close the shared crawler (called on app shutdown); with `only`, just if it's still that one."""
+        async with cls._crawler_lock:
+            if only is None or cls._crawler is only:
+                await cls._close_crawler_locked()
 
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'format': 'best',
-            'http_headers': {
+    @staticmethod
+    def _load_json(path: str):
+        """
+        Parsed contents of a JSON file, cached by mtime (None if missing). Don't mutate.
+        Blocking (stat + read on a miss) - call via asyncio.to_thread from coroutines.
+        """
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        
+        cached = FeedService._json_files.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        
+        with open(path, 'rb') as f:
+            data = json_utils.loads(f.read())
+        FeedService._json_files[path] = (mtime, data)
+        return data
+
+    async def _resolve_video_url(self, url: str, cookie_header: str, user_agent: str) -> Optional[str]:
+        """Resolve direct media URL using yt-dlp (headers are built once per feed by the caller)."""
+        ydl_opts = dict(_YDL_BASE_OPTS)
+        if cookie_header:
+            ydl_opts['http_headers'] = {
                 'Cookie': cookie_header,
                 'User-Agent': user_agent
-            } if cookie_header else None,
-            'socket_timeout': 10,
-        }
+            }
         
         try:
-            loop = asyncio.get_event_loop()
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = await loop.run_in_executor(None, lambda: ydl.extract_info(url, download=False))
-                return info.get('url')
+            async with FeedService._resolve_sem:
+                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+                    # Dedicated pool rather than to_thread's default executor;
+                    # positional args since run_in_executor takes no kwargs
+                    info = await asyncio.get_running_loop().run_in_executor(
+                        FeedService._resolve_executor, ydl.extract_info, url, False
+                    )
+                    return info.get('url')
         except Exception as e:
-            print(f"Failed to resolve URL {url}: {e}")
+            logger.warning("Failed to resolve URL %s: %s", url, e)
             return None
 
     async def get_feed(self, source_url: str = "https://www.tiktok.com/foryou", skip_cache: bool = False) -> List[dict]:
         # Check cache first (unless skip_cache is True for infinite scroll)
         cache_key = source_url
         if not skip_cache and cache_key in FeedService._feed_cache:
-            print(f"DEBUG: Returning cached results for {source_url}")
+            logger.debug("Returning cached results for %s", source_url)
             return FeedService._feed_cache[cache_key]
 
         # 1. Load cookies
         crawl_cookies = []
         cookies_path = "cookies.json"
         own_user_id = None  # Track logged-in user's ID to filter out their videos
+        cookie_header = ""  # Same cookies, joined once for every yt-dlp resolve below
         
-        if os.path.exists(cookies_path):
-            try:
-                with open(cookies_path, 'r') as f:
-                    cookie_dict = json.load(f)
-                    # Extract the logged-in user's ID from cookies
-                    own_user_id = cookie_dict.get("living_user_id")
-                    
-                    for k, v in cookie_dict.items():
-                        crawl_cookies.append({
-                            "name": k, 
-                            "value": v, 
-                            "domain": ".tiktok.com", 
-                            "path": "/"
-                        })
-                print(f"DEBUG: Loaded {len(crawl_cookies)} cookies. User ID: {own_user_id}")
-            except Exception as e:
-                print(f"Error loading cookies: {e}")
+        try:
+            cookie_dict = await asyncio.to_thread(FeedService._load_json, cookies_path)
+            if cookie_dict is not None:
+                # Extract the logged-in user's ID from cookies
+                own_user_id = cookie_dict.get("living_user_id")
+                
+                derived = FeedService._cookie_derived
+                if derived["source"] is not cookie_dict:
+                    derived["crawl_cookies"] = [
+                        {"name": k, "value": v, "domain": ".tiktok.com", "path": "/"}
+                        for k, v in cookie_dict.items()
+                    ]
+                    derived["header"] = "; ".join(f"{k}={v}" for k, v in cookie_dict.items())
+                    derived["source"] = cookie_dict
+                crawl_cookies = derived["crawl_cookies"]
+                cookie_header = derived["header"]
+                logger.debug("Loaded %d cookies. User ID: %s", len(crawl_cookies), own_user_id)
+        except Exception as e:
+            logger.warning("Error loading cookies: %s", e)
 
         # 2. Config Crawler
         default_ua = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
         user_agent = default_ua
-        if os.path.exists("session_metadata.json"):
-            try:
-                with open("session_metadata.json", "r") as f:
-                    meta = json.load(f)
-                    user_agent = meta.get("user_agent", default_ua)
-            except:
-                pass
+        try:
+            meta = await asyncio.to_thread(FeedService._load_json, "session_metadata.json")
+            if meta:
+                user_agent = meta.get("user_agent", default_ua)
+        except:
+            pass
 
         browser_config = BrowserConfig(
             headless=True,
@@ -153,58 +239,56 @@ class FeedService:
         )
 
         try:
-            print(f"DEBUG: Starting crawl for: {source_url}")
-            async with AsyncWebCrawler(config=browser_config) as crawler:
-                result = await asyncio.wait_for(
-                    crawler.arun(url=source_url, config=run_config),
-                    timeout=90.0
-                )
+            async with FeedService._crawl_lock:
+                # A crawl we waited on may have just filled the cache
+                if not skip_cache and cache_key in FeedService._feed_cache:
+                    return FeedService._feed_cache[cache_key]
+                logger.info("Starting crawl for: %s", source_url)
+                crawler = await self._get_crawler(browser_config, (cookie_header, user_agent))
+                try:
+                    result = await asyncio.wait_for(
+                        crawler.arun(url=source_url, config=run_config),
+                        timeout=90.0
+                    )
+                except BaseException:
+                    # The browser may be wedged - relaunch it on the next call
+                    await FeedService.close_crawler(only=crawler)
+                    raise
             
-            print(f"DEBUG: Crawl Success: {result.success}")
+            logger.debug("Crawl success: %s", result.success)
             if not result.success:
-                print(f"DEBUG: Crawl Error: {result.error_message}")
+                logger.warning("Crawl error: %s", result.error_message)
                 return []
 
-            # Parse SIGI_STATE from HTML (TikTok's embedded data)
-            html = result.html if result.html else ""
+            # Parse SIGI_STATE from HTML (TikTok's embedded data). crawl4ai
+            # already hands back a str, so scan it as-is - re-encoding to
+            # bytes for a bytes regex would add a pass, not save one.
+            html = result.html or ""
             videos = []
             
-            # Try to find video links directly from HTML
-            import re
-            
-            # TikTok uses relative URLs like /@username/video/1234567890
-            video_pattern = r'/@([a-zA-Z0-9_.]+)/video/(\d+)'
-            matches = re.findall(video_pattern, html)
-            
-            # Dedupe by video ID, skip own videos, and keep first 20
+            # Find video links directly from HTML, deduped by video ID and
+            # skipping videos from the logged-in user's account (excluded by
+            # the pattern itself). finditer stops scanning once we have enough.
+            video_re = _video_link_re_excluding(str(own_user_id)) if own_user_id else _VIDEO_LINK_RE
             seen_ids = set()
             unique_videos = []
-            skipped_own = 0
-            for author, video_id in matches:
-                # Skip videos from the logged-in user's account
-                if own_user_id and author == own_user_id:
-                    skipped_own += 1
-                    continue
-                    
+            for match in video_re.finditer(html):
+                author, video_id = match.groups()
                 if video_id not in seen_ids:
                     seen_ids.add(video_id)
                     unique_videos.append((author, video_id))
                     if len(unique_videos) >= 30:  # Get up to 30 videos per batch
                         break
             
-            if skipped_own > 0:
-                print(f"DEBUG: Skipped {skipped_own} videos from own account")
-            
-            print(f"DEBUG: Found {len(unique_videos)} unique videos in HTML")
-            print(f"DEBUG: HTML length: {len(html)} characters")
+            logger.debug("Found %d unique videos in HTML (%d characters)", len(unique_videos), len(html))
             
-            # Debug: Save HTML to file for inspection
-            try:
-                with open("debug_tiktok.html", "w") as f:
-                    f.write(html)
-                print("DEBUG: Saved HTML to debug_tiktok.html")
-            except:
-                pass
+            # Debug: Save HTML to file for inspection (opt-in, off the event loop)
+            if DEBUG_HTML:
+                try:
+                    await asyncio.to_thread(Path("debug_tiktok.html").write_text, html)
+                    logger.debug("Saved HTML to debug_tiktok.html")
+                except OSError:
+                    pass
             
             if unique_videos:
                 # Build video objects (author and video_id already extracted)
@@ -216,10 +300,10 @@ class FeedService:
                     })
                 
                 # Resolve direct URLs in parallel
-                print(f"DEBUG: Resolving direct URLs for {len(videos)} videos...")
+                logger.debug("Resolving direct URLs for %d videos...", len(videos))
                 
                 async def resolve_item(item):
-                    direct_url = await self._resolve_video_url(item['url'])
+                    direct_url = await self._resolve_video_url(item['url'], cookie_header, user_agent)
                     if direct_url:
                         item['url'] = direct_url
                         return item
@@ -231,22 +315,24 @@ class FeedService:
                 # Cache results
                 if final_results:
                     FeedService._feed_cache[cache_key] = final_results
-                    print(f"DEBUG: Cached {len(final_results)} videos")
+                    logger.debug("Cached %d videos", len(final_results))
                 
                 return final_results
             else:
-                print("DEBUG: No video IDs found in HTML, trying SIGI_STATE...")
+                logger.info("No video IDs found in HTML, trying SIGI_STATE...")
                 
-                # Try parsing SIGI_STATE JSON
-                sigi_pattern = r'<script id="SIGI_STATE" type="application/json">(.+?)</script>'
-                sigi_match = re.search(sigi_pattern, html, re.DOTALL)
+                # Try parsing SIGI_STATE JSON. The blob runs from the tag to the
+                # next </script>; two str.find calls locate it without a lazy
+                # DOTALL regex walking the (often 100KB+) payload
+                start = html.find(_SIGI_STATE_TAG)
+                end = html.find("</script>", start + len(_SIGI_STATE_TAG)) if start != -1 else -1
                 
-                if sigi_match:
+                if end != -1:
                     try:
-                        sigi_data = json.loads(sigi_match.group(1))
+                        sigi_data = json_utils.loads(html[start + len(_SIGI_STATE_TAG):end])
                         items = sigi_data.get("ItemModule", {})
                         
-                        for item_id, item_data in list(items.items())[:10]:
+                        for item_id, item_data in itertools.islice(items.items(), 10):
                             author = item_data.get("author", "unknown")
                             desc = item_data.get("desc", "")
                             video_url = f"https://www.tiktok.com/@{author}/video/{item_id}"
@@ -260,7 +346,7 @@ class FeedService:
                         if videos:
                             # Resolve URLs
                             async def resolve_item(item):
-                                direct_url = await self._resolve_video_url(item['url'])
+                                direct_url = await self._resolve_video_url(item['url'], cookie_header, user_agent)
                                 if direct_url:
                                     item['url'] = direct_url
                                     return item
@@ -271,19 +357,19 @@ class FeedService:
                             
                             if final_results:
                                 FeedService._feed_cache[cache_key] = final_results
-                                print(f"DEBUG: Cached {len(final_results)} videos from SIGI_STATE")
+                                logger.debug("Cached %d videos from SIGI_STATE", len(final_results))
                             
                             return final_results
                     except Exception as e:
-                        print(f"DEBUG: Failed to parse SIGI_STATE: {e}")
+                        logger.warning("Failed to parse SIGI_STATE: %s", e)
                 
                 return []
 
         except asyncio.TimeoutError:
-            print("DEBUG: Crawl timed out after 90s")
+            logger.warning("Crawl timed out after 90s")
             return []
         except Exception as e:
-            print(f"DEBUG: Crawl process failed: {e}")
+            logger.exception("Crawl process failed: %s", e)
             return []
 
     async def search_videos(self, query: str) -> List[dict]:
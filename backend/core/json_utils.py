@@ -0,0 +1,84 @@
+"""
+JSON helpers - use orjson when installed, fall back to the stdlib json module.
+"""
+
+import os
+import stat
+import tempfile
+
+from starlette.responses import JSONResponse as _StarletteJSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    import json
+
+
+def loads(data):
+    """Parse JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 encoded JSON bytes (2-space indent if requested)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+
+# The umask can only be read by setting it - done once here, since it is
+# process-wide and write_file runs on worker threads
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _file_mode(path: str) -> int:
+    """Permission bits for a rewrite of path: its current ones, or 0o666 & ~umask."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def write_file(path: str, obj, indent: bool = False):
+    """
+    Atomically write obj as JSON to path: serialize once, write it to a temp
+    file in the same directory with a single write, fsync, then rename over
+    path. Readers never see a truncated or half-written file, and a crash
+    right after the rename can't leave it empty. The file keeps its current
+    mode (new files get the usual umask mode, not mkstemp's 0600).
+    """
+    data = dumps(obj, indent=indent)
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, _file_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+# Exception raised by loads() on malformed input (orjson's is a ValueError subclass)
+JSONDecodeError = orjson.JSONDecodeError if orjson is not None else json.JSONDecodeError
+
+
+class JSONResponse(_StarletteJSONResponse):
+    """
+    JSONResponse rendered with dumps() - orjson when installed. Routes that
+    build plain dicts of JSON-native values return it directly, which skips
+    FastAPI's jsonable_encoder pass.
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -8,23 +8,56 @@ Uses Playwright to:
 """
 
 import os
-import json
+import re
 import asyncio
-import traceback
+import hashlib
+import logging
+import threading
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
 from typing import List, Dict, Optional, Any
+from urllib.parse import quote
+from cachetools import TTLCache
 from playwright.async_api import async_playwright, Response, Browser, BrowserContext
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+from core import json_utils
+
+logger = logging.getLogger(__name__)
 
 try:
     from playwright_stealth import stealth_async
 except ImportError:
-    print("WARNING: playwright_stealth not found, disabling stealth mode.")
+    logger.warning("playwright_stealth not found, disabling stealth mode.")
     async def stealth_async(page):
         pass
 
+# The stealth patches joined, in order, into one init script, so every context
+# (scrape and login) installs them once with a single call instead of on every
+# page (None: only stealth_async works)
+try:
+    from playwright_stealth import StealthConfig
+    # ";" so a script whose last statement has no semicolon can't run into the next
+    _STEALTH_JS = ";\n".join(StealthConfig().enabled_scripts)
+except ImportError:
+    _STEALTH_JS = None
+
 
 COOKIES_FILE = "cookies.json"
 USER_AGENT_FILE = "user_agent.json"
 
+# URL filters for the API responses each scrape captures (run once per response)
+_FEED_URL_RE = re.compile(r"item_list|recommend/item")
+_SEARCH_URL_RE = re.compile(r"item_list|video|general")  # alongside "search" in the URL
+_SUGGESTED_URL_RE = re.compile(r"suggest|discover|recommend/user|creator")
+
+# Scope for cookies stored without one, and the sameSite values Playwright
+# accepts keyed by their lowercased spelling - one lookup normalizes and
+# validates. Chrome cookie-export extensions write SameSite=None as
+# "no_restriction".
+_TIKTOK_COOKIE_SCOPE = {"domain": ".tiktok.com", "path": "/"}
+_SAME_SITE_VALUES = {"strict": "Strict", "lax": "Lax", "none": "None", "no_restriction": "None"}
+
 
 class PlaywrightManager:
     """Manages Playwright browser for TikTok feed interception."""
@@ -43,17 +76,371 @@ class PlaywrightManager:
         "--start-maximized"
     ]
     
+    # Extra flags for the shared headless scraping browser: nothing it would
+    # run in the background (updates, translation, media routing, audio) is
+    # needed to read the feed APIs. Site isolation is off too, so TikTok's
+    # cross-origin iframes (analytics, login widgets) share their page's
+    # renderer instead of each getting a process, and renderers are capped
+    # at MAX_CONTEXTS at launch. (--single-process is left out - it is
+    # unsupported and unstable with Playwright's multi-context use.)
+    # Chromium only honours the last --disable-features, so it is one flag.
+    SCRAPE_BROWSER_ARGS = BROWSER_ARGS + [
+        "--disable-extensions",
+        "--disable-background-networking",
+        "--disable-background-timer-throttling",
+        "--disable-renderer-backgrounding",
+        "--disable-features=Translate,MediaRouter,OptimizationHints,site-per-process,IsolateOrigins",
+        "--disable-site-isolation-trials",
+        "--mute-audio",
+    ]
+    
     DEFAULT_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
     
+    SEARCH_PAGE_URL = "https://www.tiktok.com/search/video?q="
+    
+    # Login page state for credential_login: error text and CAPTCHA presence
+    _LOGIN_STATUS_JS = """() => {
+        const error = document.querySelector('[class*="error"], [class*="Error"]');
+        return {
+            error: error ? error.innerText : "",
+            captcha: !!document.querySelector('[class*="captcha"], [class*="Captcha"], [class*="verify"]')
+        };
+    }"""
+    
+    # Scrapes only read the JSON APIs, so these never need to load. Note that
+    # routing turns off Chromium's HTTP cache for the context, so there is no
+    # warm JS cache to keep in a persistent profile; pooled contexts are what
+    # carry state (cookies, storage) between scrapes instead. Subtitle tracks
+    # and web app manifests are just as useless to a scrape.
+    BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet", "texttrack", "manifest"})
+    # API responses with a declared body smaller than this are skipped
+    # unread - too small to hold a single video or account
+    MIN_API_BODY_BYTES = 512
+    
     # Use installed Chrome instead of Playwright's Chromium (avoids slow download)
     CHROME_PATH = "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
     
     # VNC login state (class-level to persist across requests)
-    _vnc_playwright = None
     _vnc_browser = None
     _vnc_context = None
     _vnc_page = None
     _vnc_active = False
+    # In-flight check_vnc_login, shared by overlapping frontend polls
+    _vnc_check_task: Optional[asyncio.Task] = None
+    # Background browser launch started by start_vnc_login, and its failure
+    _vnc_launch_task: Optional[asyncio.Task] = None
+    _vnc_launch_error: Optional[str] = None
+
+    # Parsed credentials and preformatted Cookie header, rebuilt only when
+    # the credential files change (keyed by their mtime_ns)
+    _credentials_cache = {"mtime": None, "cookies": [], "ua": None}
+    _cookie_header_cache = {"mtime": None, "header": "", "ua": None}
+    # The files are only re-stat'ed this often; writes made through this
+    # class (login, logout, admin upload) invalidate immediately
+    CREDENTIALS_RECHECK_SECONDS = 30
+    _credentials_stat = {"checked": None, "mtime": None}
+    # save_credentials is sync and may run from worker threads, hence a thread lock
+    _save_lock = threading.Lock()
+
+    # Recent per-creator video lists, keyed by (username, limit). Profiles change
+    # slowly, so feed refreshes within the TTL skip the browser scrape entirely.
+    _user_videos_cache: TTLCache = TTLCache(maxsize=256, ttl=90)
+
+    # Shared headless browser for the scraping methods (feed, user videos,
+    # search, suggested). Launched once on first use; each call only opens and
+    # closes its own context, which is far cheaper than a browser launch.
+    # The Playwright driver (_pw) is shared by the login browsers too, so no
+    # call pays for starting the Node driver subprocess after the first.
+    _pw = None
+    _pw_lock = asyncio.Lock()
+    _browser: Optional[Browser] = None
+    _browser_lock = asyncio.Lock()
+    # Set CHROMIUM_CDP_URL (e.g. http://localhost:9222) to attach to an already
+    # running Chromium instead, so several worker processes share one browser
+    CDP_URL = os.getenv("CHROMIUM_CDP_URL")
+    # A launched browser is replaced after this many scrape calls (0 = never),
+    # so renderer memory growth can't build up forever. The old one is closed
+    # once the contexts still using it are released.
+    BROWSER_RECYCLE_AFTER = int(os.getenv("PW_BROWSER_RECYCLE_AFTER", "100"))
+    _browser_uses = 0
+    _retired_browsers: List[Browser] = []
+    # A launched browser nobody has used for this many seconds is closed (and
+    # relaunched on the next scrape), so a quiet server doesn't hold its
+    # memory; 0 keeps it open for good
+    IDLE_TIMEOUT = float(os.getenv("PW_IDLE_TIMEOUT", "300"))
+    _last_used = 0.0
+    _idle_reaper: Optional[asyncio.Task] = None
+
+    # At most MAX_CONTEXTS scrape contexts are open at once; finished ones are
+    # kept idle (pages closed) and reused by the next call with the same
+    # options, up to MAX_CONTEXTS idle in total. Entries: (context, cookie hash)
+    # Defaults to the CPU count (2-8): every open context's renderer competes
+    # for the same cores, so more than that only adds contention
+    MAX_CONTEXTS = int(os.getenv("PW_MAX_CONTEXTS") or max(2, min(8, os.cpu_count() or 1)))
+    _context_sem = asyncio.Semaphore(MAX_CONTEXTS)
+    _idle_contexts: Dict[tuple, List[tuple]] = {}
+    # Contexts warm_up() opens in the background at startup (0 = none), so
+    # the first request after boot doesn't pay for the browser launch
+    WARMUP_CONTEXTS = int(os.getenv("PW_WARMUP_CONTEXTS", "1"))
+
+    @classmethod
+    async def _get_playwright(cls):
+        """Shared Playwright driver, started on first use and stopped by shutdown()."""
+        async with cls._pw_lock:
+            if cls._pw is None:
+                cls._pw = await async_playwright().start()
+            return cls._pw
+
+    @classmethod
+    async def _get_browser(cls) -> Browser:
+        """Shared headless browser, (re)launched if it isn't running or is due for recycling."""
+        async with cls._browser_lock:
+            if (cls._browser is not None and not cls.CDP_URL and cls.BROWSER_RECYCLE_AFTER
+                    and cls._browser_uses >= cls.BROWSER_RECYCLE_AFTER and cls._browser.is_connected()):
+                logger.info("Recycling shared browser after %d uses", cls._browser_uses)
+                cls._retired_browsers.append(cls._browser)
+                cls._browser = None
+                # Idle contexts all belong to the retired browser
+                stale = [context for entries in cls._idle_contexts.values() for context, _ in entries]
+                cls._idle_contexts.clear()
+                for context in stale:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        logger.warning("Error closing context: %s", e)
+                await cls._close_retired_browsers()
+            if cls._browser is None or not cls._browser.is_connected():
+                pw = await cls._get_playwright()
+                cls._browser = None
+                if cls.CDP_URL:
+                    logger.info("Connecting to shared browser at %s...", cls.CDP_URL)
+                    try:
+                        cls._browser = await pw.chromium.connect_over_cdp(cls.CDP_URL, timeout=10000)
+                    except Exception as e:
+                        # Don't fail every scrape while the shared browser is down
+                        logger.warning("Shared browser unreachable (%s), launching a local one", e)
+                if cls._browser is None:
+                    logger.info("Launching shared browser...")
+                    cls._browser = await pw.chromium.launch(
+                        headless=True,
+                        executable_path=cls.CHROME_PATH,
+                        # One renderer per context that can be open at once
+                        args=cls.SCRAPE_BROWSER_ARGS + [f"--renderer-process-limit={cls.MAX_CONTEXTS}"],
+                        # Shutdown goes through the app lifespan, not SIGINT
+                        handle_sigint=False
+                    )
+                cls._browser_uses = 0
+                if cls.IDLE_TIMEOUT and not cls.CDP_URL and cls._idle_reaper is None:
+                    cls._idle_reaper = asyncio.ensure_future(cls._reap_idle_browser())
+            cls._browser_uses += 1
+            cls._last_used = time.monotonic()
+            return cls._browser
+
+    @classmethod
+    async def _reap_idle_browser(cls):
+        """Background task: close the shared browser once it has sat unused for IDLE_TIMEOUT."""
+        while True:
+            await asyncio.sleep(min(cls.IDLE_TIMEOUT, 30))
+            async with cls._browser_lock:
+                browser = cls._browser
+                if browser is None:
+                    cls._idle_reaper = None
+                    return
+                # Contexts beyond the idle pool are still in use by a scrape
+                idle_count = sum(len(v) for v in cls._idle_contexts.values())
+                if len(browser.contexts) > idle_count or time.monotonic() - cls._last_used < cls.IDLE_TIMEOUT:
+                    continue
+                logger.info("Closing shared browser after %.0fs idle", time.monotonic() - cls._last_used)
+                cls._browser = None
+                cls._idle_contexts.clear()
+                cls._idle_reaper = None
+                try:
+                    await browser.close()
+                except Exception as e:
+                    logger.warning("Error closing shared browser: %s", e)
+                return
+
+    @classmethod
+    async def _close_retired_browsers(cls):
+        """Close recycled browsers that no longer have any open context."""
+        for browser in [b for b in cls._retired_browsers if not b.contexts]:
+            cls._retired_browsers.remove(browser)
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.warning("Error closing retired browser: %s", e)
+
+    # Last cookie list hashed and its hash. Scrapes nearly always pass the
+    # stored cookies, whose dicts are shared with the credentials cache, so
+    # the equality check mostly short-circuits on identity
+    _cookie_hash_memo: tuple = (None, b"")
+
+    @classmethod
+    def _cookie_hash(cls, cookies: Optional[List[dict]]) -> bytes:
+        """Short digest of a cookie list, to tell which cookies a pooled context holds."""
+        memo_cookies, memo_hash = cls._cookie_hash_memo
+        cookies = cookies or []
+        if cookies == memo_cookies:
+            return memo_hash
+        digest = hashlib.blake2b(json_utils.dumps(cookies), digest_size=8).digest()
+        cls._cookie_hash_memo = (list(cookies), digest)
+        return digest
+
+    @classmethod
+    @asynccontextmanager
+    async def _acquire_context(cls, user_agent: str, cookies: Optional[List[dict]] = None,
+                               block_resources: bool = True, **options):
+        """
+        Borrow a context holding `cookies` on the shared browser (waits while
+        MAX_CONTEXTS are in use). Idle contexts keep their cookies, tagged with
+        a hash of the list applied, so reusing one with the same cookies skips
+        add_cookies entirely; otherwise its cookies are replaced.
+        With block_resources, images/media/fonts/CSS are aborted (the default
+        for scrapes, which only read the JSON APIs).
+        """
+        key = (user_agent, block_resources, tuple(sorted(options.items())))
+        cookie_hash = cls._cookie_hash(cookies)
+        async with cls._context_sem:
+            browser = await cls._get_browser()
+            
+            # Contexts from a browser that has since been relaunched are dead
+            idle = cls._idle_contexts[key] = [
+                entry for entry in cls._idle_contexts.get(key, []) if entry[0].browser is browser
+            ]
+            context, context_hash = None, None
+            if idle:
+                # Prefer one that already holds these cookies
+                match = next((i for i, entry in enumerate(idle) if entry[1] == cookie_hash), len(idle) - 1)
+                context, context_hash = idle.pop(match)
+            if context is None:
+                # A fresh context gets its cookies as storage state, applied
+                # while it's created instead of in a separate add_cookies call
+                try:
+                    context = await browser.new_context(
+                        user_agent=user_agent,
+                        storage_state={"cookies": cookies or [], "origins": []},
+                        **options
+                    )
+                except Exception as e:
+                    if cookies:
+                        logger.warning("Error applying cookies: %s", e)
+                        logger.debug("Sample cookie: %s", cookies[0])
+                    raise
+                context_hash = cookie_hash
+                # Registered once per context, so it carries over when reused
+                if block_resources:
+                    await context.route("**/*", cls._block_heavy_resources)
+                await cls._install_stealth(context)
+            
+            reusable = False
+            try:
+                if context_hash != cookie_hash:
+                    if context_hash is not None:
+                        await context.clear_cookies()
+                    if cookies:
+                        try:
+                            await context.add_cookies(cookies)
+                            logger.debug("Applied %d cookies to browser context", len(cookies))
+                        except Exception as e:
+                            logger.warning("Error applying cookies: %s", e)
+                            logger.debug("Sample cookie: %s", cookies[0])
+                            raise
+                    context_hash = cookie_hash
+                
+                yield context
+                reusable = True
+            finally:
+                if reusable:
+                    # Only the pages go - cookies and storage the site set
+                    # during this scrape stay with the pooled context
+                    try:
+                        await asyncio.gather(*(page.close() for page in context.pages))
+                    except Exception:
+                        reusable = False
+                cls._last_used = time.monotonic()
+                # A context on a recycled browser is never pooled
+                current = browser is cls._browser
+                idle_count = sum(len(v) for v in cls._idle_contexts.values())
+                if reusable and current and idle_count < cls.MAX_CONTEXTS:
+                    cls._idle_contexts.setdefault(key, []).append((context, context_hash))
+                else:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        logger.warning("Error closing context: %s", e)
+                if not current:
+                    await cls._close_retired_browsers()
+
+    @staticmethod
+    async def _install_stealth(context: BrowserContext):
+        """Add the stealth patches to a context as init scripts (no-op when only stealth_async works)."""
+        if _STEALTH_JS:
+            await context.add_init_script(_STEALTH_JS)
+
+    @staticmethod
+    async def _new_page(context: BrowserContext):
+        """Open a page on a context set up by _install_stealth (falls back to per-page stealth_async)."""
+        page = await context.new_page()
+        if _STEALTH_JS is None:
+            await stealth_async(page)
+        return page
+
+    @classmethod
+    async def _block_heavy_resources(cls, route):
+        """Route handler: abort BLOCKED_RESOURCE_TYPES (images, media, fonts, CSS...), let everything else through."""
+        request = route.request
+        if (request.resource_type in cls.BLOCKED_RESOURCE_TYPES
+                and "item_list" not in request.url and "recommend/item" not in request.url):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    @classmethod
+    async def warm_up(cls, count: int = 1):
+        """
+        Launch the shared browser and park `count` ready scrape contexts
+        (stored cookies, default options - what feed, search and user-video
+        scrapes ask for) in the idle pool, so the first requests skip both
+        the browser launch and the context setup.
+        """
+        count = max(0, min(count, cls.MAX_CONTEXTS))
+        if not count:
+            return
+        cookies, user_agent = await cls.load_stored_credentials_async()
+        user_agent = user_agent or cls.DEFAULT_USER_AGENT
+        # Hold them all at once so each is a separate context; leaving the
+        # stack releases them into the pool
+        async with AsyncExitStack() as stack:
+            await asyncio.gather(*(
+                stack.enter_async_context(cls._acquire_context(user_agent, cookies))
+                for _ in range(count)
+            ))
+        logger.info("Browser warmed up with %d idle context(s)", count)
+
+    @classmethod
+    async def shutdown(cls):
+        """
+        Close the shared browser and stop Playwright (called on app shutdown).
+        A CDP-attached browser is only disconnected from; it keeps running.
+        """
+        if cls._idle_reaper is not None:
+            cls._idle_reaper.cancel()
+            cls._idle_reaper = None
+        async with cls._browser_lock:
+            # Idle contexts close along with the browser
+            cls._idle_contexts.clear()
+            try:
+                for browser in cls._retired_browsers:
+                    await browser.close()
+                if cls._browser is not None:
+                    await cls._browser.close()
+                if cls._pw is not None:
+                    await cls._pw.stop()
+            except Exception as e:
+                logger.warning("Error closing shared browser: %s", e)
+            cls._browser = None
+            cls._retired_browsers.clear()
+            cls._pw = None
 
     @staticmethod
     def parse_json_credentials(json_creds: Any) -> tuple[List[dict], str]:
@@ -81,8 +468,8 @@ class PlaywrightManager:
                     }
                     if "sameSite" in c and c["sameSite"]:
                         # Playwright expects "Strict", "Lax", or "None"
-                        ss = str(c["sameSite"]).capitalize()
-                        if ss in ["Strict", "Lax", "None"]:
+                        ss = _SAME_SITE_VALUES.get(str(c["sameSite"]).lower())
+                        if ss:
                             cookie["sameSite"] = ss
                     
                     cookies.append(cookie)
@@ -100,109 +487,210 @@ class PlaywrightManager:
             
             # Parse cookies from the cookies dict (preferred)
             if cookies_dict:
-                for name, value in cookies_dict.items():
-                    cookies.append({
-                        "name": name,
-                        "value": str(value),
-                        "domain": ".tiktok.com",
-                        "path": "/"
-                    })
+                cookies = [
+                    {"name": name, "value": value if isinstance(value, str) else str(value), **_TIKTOK_COOKIE_SCOPE}
+                    for name, value in cookies_dict.items()
+                ]
             # Fallback: parse from Cookie header string
             elif "Cookie" in headers:
-                cookie_str = headers["Cookie"]
-                for part in cookie_str.split(";"):
-                    part = part.strip()
-                    if "=" in part:
-                        name, value = part.split("=", 1)
-                        cookies.append({
-                            "name": name.strip(),
-                            "value": value.strip(),
-                            "domain": ".tiktok.com",
-                            "path": "/"
-                        })
+                # split + partition keeps the per-pair work in C (about twice
+                # as fast as walking the string with str.find)
+                for part in headers["Cookie"].split(";"):
+                    name, sep, value = part.partition("=")
+                    if sep:
+                        name = name.strip()
+                        if name:
+                            cookies.append({"name": name, "value": value.strip(), **_TIKTOK_COOKIE_SCOPE})
         
         return cookies, user_agent
 
+    @classmethod
+    def load_stored_credentials(cls) -> tuple[List[dict], str]:
+        """Load cookies and user agent from stored files (cached by file mtime)."""
+        cache = cls._credentials_cache
+        mtime = cls._credentials_mtime()
+        if cache["mtime"] != mtime:
+            cache["cookies"], cache["ua"] = cls._read_stored_credentials()
+            cache["mtime"] = mtime
+        # Copy the list so callers can't modify the cached one
+        return list(cache["cookies"]), cache["ua"]
+
+    @staticmethod
+    def _sanitize_cookie(c: dict) -> dict:
+        """
+        Playwright cookie from a stored one (must have name and value).
+        Optional fields are only set when they have valid values.
+        """
+        cookie = {
+            "name": c["name"],
+            "value": str(c["value"]),
+            "domain": c.get("domain") or ".tiktok.com",
+            "path": c.get("path") or "/",
+        }
+        secure = c.get("secure")
+        if secure is not None:
+            cookie["secure"] = bool(secure)
+        http_only = c.get("httpOnly")
+        if http_only is not None:
+            cookie["httpOnly"] = bool(http_only)
+        # Sanitize sameSite - Playwright only accepts Strict|Lax|None; an
+        # invalid value is just omitted
+        same_site = c.get("sameSite")
+        if same_site:
+            ss = _SAME_SITE_VALUES.get(str(same_site).lower())
+            if ss:
+                cookie["sameSite"] = ss
+        return cookie
+
     @staticmethod
-    def load_stored_credentials() -> tuple[List[dict], str]:
-        """Load cookies and user agent from stored files."""
+    def _read_stored_credentials() -> tuple[List[dict], str]:
+        """Parse cookies and user agent from the stored files."""
         cookies = []
         user_agent = PlaywrightManager.DEFAULT_USER_AGENT
         
         if os.path.exists(COOKIES_FILE):
             try:
-                with open(COOKIES_FILE, "r") as f:
-                    data = json.load(f)
+                with open(COOKIES_FILE, "rb") as f:
+                    data = json_utils.loads(f.read())
                     if isinstance(data, list):
                         # Sanitize each cookie for Playwright compatibility
-                        for c in data:
-                            if isinstance(c, dict) and "name" in c and "value" in c:
-                                cookie = {
-                                    "name": c["name"],
-                                    "value": str(c["value"]),
-                                    "domain": c.get("domain") or ".tiktok.com",
-                                    "path": c.get("path") or "/",
-                                }
-                                # Only add optional fields if they have valid values
-                                if c.get("secure") is not None:
-                                    cookie["secure"] = bool(c["secure"])
-                                if c.get("httpOnly") is not None:
-                                    cookie["httpOnly"] = bool(c["httpOnly"])
-                                # Sanitize sameSite - Playwright only accepts Strict|Lax|None
-                                if c.get("sameSite"):
-                                    ss = str(c["sameSite"]).capitalize()
-                                    if ss in ["Strict", "Lax", "None"]:
-                                        cookie["sameSite"] = ss
-                                    # If invalid, just omit it
-                                cookies.append(cookie)
+                        sanitize = PlaywrightManager._sanitize_cookie
+                        cookies = [
+                            sanitize(c) for c in data
+                            if isinstance(c, dict) and "name" in c and "value" in c
+                        ]
                     elif isinstance(data, dict):
                         # Backward compatibility or simple dict format
-                        for name, value in data.items():
-                            cookies.append({
-                                "name": name,
-                                "value": str(value),
-                                "domain": ".tiktok.com",
-                                "path": "/"
-                            })
+                        cookies = [
+                            {"name": name, "value": value if isinstance(value, str) else str(value), **_TIKTOK_COOKIE_SCOPE}
+                            for name, value in data.items()
+                        ]
             except Exception as e:
-                print(f"Error loading cookies: {e}")
+                logger.warning("Error loading cookies: %s", e)
         
         if os.path.exists(USER_AGENT_FILE):
             try:
-                with open(USER_AGENT_FILE, "r") as f:
-                    data = json.load(f)
+                with open(USER_AGENT_FILE, "rb") as f:
+                    data = json_utils.loads(f.read())
                     user_agent = data.get("user_agent", user_agent)
             except:
                 pass
         
         return cookies, user_agent
 
+    @classmethod
+    def _credentials_mtime(cls) -> tuple:
+        """
+        (mtime_ns, size) of the cookie and user agent files (None if missing).
+        The size catches rewrites within the same mtime tick on filesystems
+        with coarse timestamps.
+        """
+        state = cls._credentials_stat
+        now = time.monotonic()
+        if state["checked"] is not None and now - state["checked"] < cls.CREDENTIALS_RECHECK_SECONDS:
+            return state["mtime"]
+        
+        stamps = []
+        for path in (COOKIES_FILE, USER_AGENT_FILE):
+            try:
+                st = os.stat(path)
+                stamps.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                stamps.append(None)
+        state["mtime"] = tuple(stamps)
+        state["checked"] = now
+        return state["mtime"]
+
+    @classmethod
+    def credentials_cached(cls) -> bool:
+        """True if load_stored_credentials()/get_cookie_header() would be served from memory."""
+        state = cls._credentials_stat
+        if state["checked"] is None or time.monotonic() - state["checked"] >= cls.CREDENTIALS_RECHECK_SECONDS:
+            return False
+        return (cls._credentials_cache["mtime"] == state["mtime"]
+                and cls._cookie_header_cache["mtime"] == state["mtime"])
+
+    @classmethod
+    def invalidate_credentials_cache(cls):
+        """Drop cached credentials; call after changing the stored files."""
+        cls._credentials_stat["checked"] = None
+        cls._credentials_cache["mtime"] = None
+        cls._cookie_header_cache["mtime"] = None
+
+    @classmethod
+    def get_cookie_header(cls) -> tuple[str, str]:
+        """
+        Return (cookie_header, user_agent) for direct HTTP requests to TikTok.
+        The header is cached and only rebuilt when the stored files change.
+        """
+        cache = cls._cookie_header_cache
+        mtime = cls._credentials_mtime()
+        if cache["mtime"] == mtime:
+            return cache["header"], cache["ua"]
+        
+        cookies, user_agent = cls.load_stored_credentials()
+        cache["header"] = "; ".join(f"{c['name']}={c['value']}" for c in cookies)
+        cache["ua"] = user_agent
+        cache["mtime"] = mtime
+        return cache["header"], cache["ua"]
+
+    # Async variants for event-loop callers: a cache hit is answered inline,
+    # anything that touches the files runs in a worker thread
+
+    @classmethod
+    async def load_stored_credentials_async(cls) -> tuple[List[dict], str]:
+        if cls.credentials_cached():
+            return cls.load_stored_credentials()
+        return await asyncio.to_thread(cls.load_stored_credentials)
+
+    @classmethod
+    async def get_cookie_header_async(cls) -> tuple[str, str]:
+        if cls.credentials_cached():
+            return cls.get_cookie_header()
+        return await asyncio.to_thread(cls.get_cookie_header)
+
+    @staticmethod
+    async def save_credentials_async(cookies: List[dict] | dict, user_agent: str = None):
+        await asyncio.to_thread(PlaywrightManager.save_credentials, cookies, user_agent)
+
     @staticmethod
     def save_credentials(cookies: List[dict] | dict, user_agent: str = None):
-        """Save cookies and user agent to files."""
-        with open(COOKIES_FILE, "w") as f:
-            json.dump(cookies, f, indent=2)
-        
-        if user_agent:
-            with open(USER_AGENT_FILE, "w") as f:
-                json.dump({"user_agent": user_agent}, f)
+        """Save cookies and user agent to files (atomic replace; concurrent logins serialized)."""
+        with PlaywrightManager._save_lock:
+            json_utils.write_file(COOKIES_FILE, cookies, indent=True)
+            
+            if user_agent:
+                json_utils.write_file(USER_AGENT_FILE, {"user_agent": user_agent})
+            
+            PlaywrightManager.invalidate_credentials_cache()
 
     @classmethod
     async def start_vnc_login(cls) -> dict:
         """
         Start a visible browser for VNC login.
         The browser displays on DISPLAY=:99 which is streamed via noVNC.
-        Returns immediately - browser stays open for user interaction.
+        Returns immediately: the browser launches in the background (polls to
+        check_vnc_login report "initializing" until it's up) and then stays
+        open for user interaction.
         """
         # Close any existing VNC session
-        if cls._vnc_active:
+        if cls._vnc_active or cls._vnc_launch_task is not None:
             await cls.stop_vnc_login()
         
-        print("DEBUG: Starting VNC login browser...")
-        
+        logger.info("Starting VNC login browser...")
+        cls._vnc_launch_error = None
+        cls._vnc_launch_task = asyncio.ensure_future(cls._launch_vnc_browser())
+        return {
+            "status": "starting",
+            "message": "Browser is starting. Please login via the VNC stream once it appears."
+        }
+
+    @classmethod
+    async def _launch_vnc_browser(cls):
+        """Open the visible browser on TikTok's login page (start_vnc_login's background task)."""
         try:
-            cls._vnc_playwright = await async_playwright().start()
-            cls._vnc_browser = await cls._vnc_playwright.chromium.launch(
+            pw = await cls._get_playwright()
+            cls._vnc_browser = await pw.chromium.launch(
                 headless=False,  # Visible browser
                 args=cls.BROWSER_ARGS
             )
@@ -211,47 +699,52 @@ class PlaywrightManager:
                 user_agent=cls.DEFAULT_USER_AGENT,
                 viewport={"width": 1920, "height": 1000}
             )
+            await cls._install_stealth(cls._vnc_context)
             
-            cls._vnc_page = await cls._vnc_context.new_page()
-            await stealth_async(cls._vnc_page)
+            cls._vnc_page = await cls._new_page(cls._vnc_context)
             await cls._vnc_page.goto("https://www.tiktok.com/login", wait_until="domcontentloaded")
             
             cls._vnc_active = True
-            print("DEBUG: VNC browser opened with TikTok login page")
-            
-            return {
-                "status": "started",
-                "message": "Browser opened. Please login via the VNC stream."
-            }
+            logger.info("VNC browser opened with TikTok login page")
             
         except Exception as e:
-            print(f"DEBUG: VNC login start error: {e}")
+            logger.warning("VNC login start error: %s", e)
             cls._vnc_active = False
-            return {
-                "status": "error",
-                "message": f"Failed to start browser: {str(e)}"
-            }
+            cls._vnc_launch_error = str(e)
 
     @classmethod
     async def check_vnc_login(cls) -> dict:
         """
         Check if user has logged in by looking for sessionid cookie.
-        Called by frontend via polling.
+        Called by frontend via polling; a poll arriving while a check is still
+        running waits for that check instead of starting another.
         """
+        task = cls._vnc_check_task
+        if task is None or task.done():
+            task = cls._vnc_check_task = asyncio.ensure_future(cls._check_vnc_login())
+        # Shield so one poller going away doesn't cancel the check for the rest
+        return await asyncio.shield(task)
+
+    @classmethod
+    async def _check_vnc_login(cls) -> dict:
+        launch = cls._vnc_launch_task
+        if launch is not None and not launch.done():
+            return {"status": "initializing", "logged_in": False}
+        if cls._vnc_launch_error:
+            return {
+                "status": "error",
+                "logged_in": False,
+                "message": f"Failed to start browser: {cls._vnc_launch_error}"
+            }
         if not cls._vnc_active or not cls._vnc_context:
             return {"status": "not_active", "logged_in": False}
         
         try:
-            all_cookies = await cls._vnc_context.cookies()
-            cookies_found = {}
-            
-            for cookie in all_cookies:
-                if cookie.get("domain", "").endswith("tiktok.com"):
-                    cookies_found[cookie["name"]] = cookie["value"]
+            cookies_found = await cls._tiktok_session_cookies(cls._vnc_context)
             
             if "sessionid" in cookies_found:
                 # Save cookies and close browser
-                cls.save_credentials(cookies_found, cls.DEFAULT_USER_AGENT)
+                await cls.save_credentials_async(cookies_found, cls.DEFAULT_USER_AGENT)
                 await cls.stop_vnc_login()
                 
                 return {
@@ -264,30 +757,110 @@ class PlaywrightManager:
             return {"status": "waiting", "logged_in": False}
             
         except Exception as e:
-            print(f"DEBUG: VNC check error: {e}")
+            logger.warning("VNC check error: %s", e)
             return {"status": "error", "logged_in": False, "message": str(e)}
 
     @classmethod
     async def stop_vnc_login(cls) -> dict:
         """Close the VNC browser session."""
-        print("DEBUG: Stopping VNC login browser...")
+        logger.info("Stopping VNC login browser...")
+        
+        # A launch still in progress is abandoned; whatever it got to is closed below
+        launch, cls._vnc_launch_task = cls._vnc_launch_task, None
+        if launch is not None and not launch.done():
+            launch.cancel()
+            try:
+                await launch
+            except BaseException:
+                pass
         
         try:
             if cls._vnc_browser:
                 await cls._vnc_browser.close()
-            if cls._vnc_playwright:
-                await cls._vnc_playwright.stop()
         except Exception as e:
-            print(f"DEBUG: Error closing VNC browser: {e}")
+            logger.warning("Error closing VNC browser: %s", e)
         
         cls._vnc_browser = None
         cls._vnc_context = None
         cls._vnc_page = None
-        cls._vnc_playwright = None
         cls._vnc_active = False
         
         return {"status": "stopped"}
 
+    @staticmethod
+    async def _tiktok_session_cookies(context: BrowserContext) -> Dict[str, str]:
+        """
+        name -> value for the context's tiktok.com cookies once they include
+        sessionid, else {}. Login polls nearly always find no session yet, so
+        that case is a scan without building the dict.
+        """
+        cookies = await context.cookies()
+        if not any(cookie["name"] == "sessionid" and cookie.get("domain", "").endswith("tiktok.com")
+                   for cookie in cookies):
+            return {}
+        return {
+            cookie["name"]: cookie["value"]
+            for cookie in cookies
+            if cookie.get("domain", "").endswith("tiktok.com")
+        }
+
+    @staticmethod
+    async def _wait_for_session(page, timeout_seconds: float, on_waiting=None) -> tuple:
+        """
+        Wait until the page's context has a sessionid cookie.
+        Cookies are checked at once whenever the page navigates (a finished
+        login redirects) or a login/passport API call answers (that is where
+        sessionid gets set), and otherwise polled, backing off from 0.5s to 4s.
+        on_waiting() runs after each check without a session; a non-None
+        result stops the wait.
+        
+        Returns: (tiktok_cookies, on_waiting result or None) - cookies lack
+        sessionid on timeout.
+        """
+        navigated = asyncio.Event()
+        
+        def on_navigation(frame):
+            if frame == page.main_frame:
+                navigated.set()
+        
+        def on_response(response):
+            url = response.url
+            if "/passport/" in url or "login" in url:
+                navigated.set()
+        
+        page.on("framenavigated", on_navigation)
+        page.on("response", on_response)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        interval = 0.5
+        cookies_found = {}
+        try:
+            while True:
+                remaining = started + timeout_seconds - loop.time()
+                if remaining <= 0:
+                    return cookies_found, None
+                try:
+                    await asyncio.wait_for(navigated.wait(), timeout=min(interval, remaining))
+                    # Page activity - check now and poll quickly again
+                    navigated.clear()
+                    interval = 0.5
+                except asyncio.TimeoutError:
+                    interval = min(interval * 2, 4.0)
+                
+                cookies_found = await PlaywrightManager._tiktok_session_cookies(page.context)
+                if "sessionid" in cookies_found:
+                    return cookies_found, None
+                
+                if on_waiting is not None:
+                    result = await on_waiting()
+                    if result is not None:
+                        return cookies_found, result
+                
+                logger.debug("Waiting for login... (%.0fs)", loop.time() - started)
+        finally:
+            page.remove_listener("framenavigated", on_navigation)
+            page.remove_listener("response", on_response)
+
     @staticmethod
     async def credential_login(username: str, password: str, timeout_seconds: int = 60) -> dict:
         """
@@ -301,116 +874,106 @@ class PlaywrightManager:
             
         Returns: {"status": "success/error", "message": "...", "cookie_count": N}
         """
-        print(f"DEBUG: Starting headless credential login for: {username}")
+        logger.info("Starting headless credential login for: %s", username)
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=True,
-                args=PlaywrightManager.BROWSER_ARGS
-            )
-            
+        p = await PlaywrightManager._get_playwright()
+        browser = await p.chromium.launch(
+            headless=True,
+            args=PlaywrightManager.BROWSER_ARGS
+        )
+        
+        try:
+            # The driver is shared now, so its exit no longer takes a
+            # half-set-up browser down with it - close it in the except below
             context = await browser.new_context(
                 user_agent=PlaywrightManager.DEFAULT_USER_AGENT
             )
+            await PlaywrightManager._install_stealth(context)
             
-            page = await context.new_page()
-            await stealth_async(page)
+            page = await PlaywrightManager._new_page(context)
             
-            try:
-                # Navigate to TikTok login page
-                await page.goto("https://www.tiktok.com/login/phone-or-email/email", wait_until="domcontentloaded")
-                await asyncio.sleep(2)
-                
-                print("DEBUG: Looking for login form...")
-                
-                # Wait for and fill username/email field
-                username_selector = 'input[name="username"], input[placeholder*="Email"], input[placeholder*="email"], input[type="text"]'
-                await page.wait_for_selector(username_selector, timeout=10000)
-                await page.fill(username_selector, username)
-                await asyncio.sleep(0.5)
-                
-                # Fill password field
-                password_selector = 'input[type="password"]'
-                await page.wait_for_selector(password_selector, timeout=5000)
-                await page.fill(password_selector, password)
-                await asyncio.sleep(0.5)
-                
-                print("DEBUG: Credentials filled, clicking login...")
-                
-                # Click login button
-                login_button = 'button[type="submit"], button[data-e2e="login-button"]'
-                await page.click(login_button)
-                
-                # Wait for login to complete - poll for sessionid cookie
-                print("DEBUG: Waiting for login to complete...")
-                elapsed = 0
-                check_interval = 2
-                cookies_found = {}
-                
-                while elapsed < timeout_seconds:
-                    await asyncio.sleep(check_interval)
-                    elapsed += check_interval
-                    
-                    # Check for error messages
-                    error_el = await page.query_selector('[class*="error"], [class*="Error"]')
-                    if error_el:
-                        error_text = await error_el.inner_text()
-                        if error_text and len(error_text) > 0:
-                            await browser.close()
-                            return {
-                                "status": "error",
-                                "message": f"Login failed: {error_text[:100]}",
-                                "cookie_count": 0
-                            }
-                    
-                    # Check cookies
-                    all_cookies = await context.cookies()
-                    for cookie in all_cookies:
-                        if cookie.get("domain", "").endswith("tiktok.com"):
-                            cookies_found[cookie["name"]] = cookie["value"]
-                    
-                    if "sessionid" in cookies_found:
-                        print(f"DEBUG: Login successful! Found {len(cookies_found)} cookies.")
-                        break
-                    
-                    # Check if CAPTCHA or verification needed
-                    captcha = await page.query_selector('[class*="captcha"], [class*="Captcha"], [class*="verify"]')
-                    if captcha:
-                        await browser.close()
-                        return {
-                            "status": "error",
-                            "message": "TikTok requires verification (CAPTCHA). Please try the cookie method.",
-                            "cookie_count": 0
-                        }
-                    
-                    print(f"DEBUG: Waiting for login... ({elapsed}s)")
-                
-                await browser.close()
-                
-                if "sessionid" not in cookies_found:
+            # Navigate to TikTok login page
+            await page.goto("https://www.tiktok.com/login/phone-or-email/email", wait_until="domcontentloaded")
+            
+            logger.debug("Looking for login form...")
+            
+            # Wait for and fill username/email field (the selector wait is
+            # what gates on the form rendering - no fixed delay needed)
+            username_selector = 'input[name="username"], input[placeholder*="Email"], input[placeholder*="email"], input[type="text"]'
+            await page.wait_for_selector(username_selector, timeout=10000)
+            await page.fill(username_selector, username)
+            await asyncio.sleep(0.5)
+            
+            # Fill password field
+            password_selector = 'input[type="password"]'
+            await page.wait_for_selector(password_selector, timeout=5000)
+            await page.fill(password_selector, password)
+            await asyncio.sleep(0.5)
+            
+            logger.debug("Credentials filled, clicking login...")
+            
+            # Click login button
+            login_button = 'button[type="submit"], button[data-e2e="login-button"]'
+            await page.click(login_button)
+            
+            async def login_failed() -> Optional[dict]:
+                """Error result if the page shows a login error or a CAPTCHA."""
+                # One round-trip checks both in the page
+                status = await page.evaluate(PlaywrightManager._LOGIN_STATUS_JS)
+                error_text = status.get("error")
+                if error_text:
                     return {
                         "status": "error",
-                        "message": "Login timed out. Check your credentials or try the cookie method.",
+                        "message": f"Login failed: {error_text[:100]}",
                         "cookie_count": 0
                     }
                 
-                # Save credentials
-                PlaywrightManager.save_credentials(cookies_found, PlaywrightManager.DEFAULT_USER_AGENT)
-                
-                return {
-                    "status": "success",
-                    "message": "Successfully logged in!",
-                    "cookie_count": len(cookies_found)
-                }
-                
-            except Exception as e:
-                await browser.close()
-                print(f"DEBUG: Login error: {e}")
+                # Check if CAPTCHA or verification needed
+                if status.get("captcha"):
+                    return {
+                        "status": "error",
+                        "message": "TikTok requires verification (CAPTCHA). Please try the cookie method.",
+                        "cookie_count": 0
+                    }
+                return None
+            
+            # Wait for login to complete - watch for the sessionid cookie
+            logger.info("Waiting for login to complete...")
+            cookies_found, failure = await PlaywrightManager._wait_for_session(
+                page, timeout_seconds, on_waiting=login_failed
+            )
+            
+            await browser.close()
+            
+            if failure:
+                return failure
+            
+            if "sessionid" not in cookies_found:
                 return {
                     "status": "error",
-                    "message": f"Login failed: {str(e)[:100]}",
+                    "message": "Login timed out. Check your credentials or try the cookie method.",
                     "cookie_count": 0
                 }
+            
+            logger.info("Login successful! Found %d cookies.", len(cookies_found))
+            
+            # Save credentials
+            await PlaywrightManager.save_credentials_async(cookies_found, PlaywrightManager.DEFAULT_USER_AGENT)
+            
+            return {
+                "status": "success",
+                "message": "Successfully logged in!",
+                "cookie_count": len(cookies_found)
+            }
+            
+        except Exception as e:
+            await browser.close()
+            logger.warning("Login error: %s", e)
+            return {
+                "status": "error",
+                "message": f"Login failed: {str(e)[:100]}",
+                "cookie_count": 0
+            }
 
     @staticmethod
     async def browser_login(timeout_seconds: int = 180) -> dict:
@@ -420,138 +983,113 @@ class PlaywrightManager:
         
         Returns: {"status": "success/timeout", "cookies": {...}, "cookie_count": N}
         """
-        print("DEBUG: Opening browser for TikTok login...")
+        logger.info("Opening browser for TikTok login...")
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=False,
-                args=PlaywrightManager.BROWSER_ARGS
-            )
-            
+        p = await PlaywrightManager._get_playwright()
+        browser = await p.chromium.launch(
+            headless=False,
+            args=PlaywrightManager.BROWSER_ARGS
+        )
+        
+        # The shared driver outlives this call, so close the browser ourselves
+        # even if the page setup or navigation fails
+        try:
             context = await browser.new_context(
                 user_agent=PlaywrightManager.DEFAULT_USER_AGENT
             )
+            await PlaywrightManager._install_stealth(context)
             
-            page = await context.new_page()
-            await stealth_async(page)
+            page = await PlaywrightManager._new_page(context)
             
             # Navigate to TikTok login
             await page.goto("https://www.tiktok.com/login", wait_until="domcontentloaded")
-            print("DEBUG: Login page opened. Waiting for user to complete login...")
-            
-            # Poll for sessionid cookie
-            elapsed = 0
-            check_interval = 2
-            cookies_found = {}
-            
-            while elapsed < timeout_seconds:
-                await asyncio.sleep(check_interval)
-                elapsed += check_interval
-                
-                all_cookies = await context.cookies()
-                
-                for cookie in all_cookies:
-                    if cookie.get("domain", "").endswith("tiktok.com"):
-                        cookies_found[cookie["name"]] = cookie["value"]
-                
-                if "sessionid" in cookies_found:
-                    print(f"DEBUG: Login detected! Found {len(cookies_found)} cookies.")
-                    break
-                
-                print(f"DEBUG: Waiting for login... ({elapsed}s)")
+            logger.info("Login page opened. Waiting for user to complete login...")
             
+            # Wait for the sessionid cookie
+            cookies_found, _ = await PlaywrightManager._wait_for_session(page, timeout_seconds)
+            if "sessionid" in cookies_found:
+                logger.info("Login detected! Found %d cookies.", len(cookies_found))
+        finally:
             await browser.close()
-            
-            if "sessionid" not in cookies_found:
-                return {
-                    "status": "timeout",
-                    "message": "Login timed out. Please try again.",
-                    "cookie_count": 0
-                }
-            
-            # Save credentials
-            PlaywrightManager.save_credentials(cookies_found, PlaywrightManager.DEFAULT_USER_AGENT)
-            
+        
+        if "sessionid" not in cookies_found:
             return {
-                "status": "success",
-                "message": "Successfully connected to TikTok!",
-                "cookie_count": len(cookies_found)
+                "status": "timeout",
+                "message": "Login timed out. Please try again.",
+                "cookie_count": 0
             }
+        
+        # Save credentials
+        await PlaywrightManager.save_credentials_async(cookies_found, PlaywrightManager.DEFAULT_USER_AGENT)
+        
+        return {
+            "status": "success",
+            "message": "Successfully connected to TikTok!",
+            "cookie_count": len(cookies_found)
+        }
 
     @staticmethod
-    async def intercept_feed(cookies: List[dict] = None, user_agent: str = None, scroll_count: int = 5) -> List[dict]:
-        """Navigate to TikTok feed and intercept API responses."""
+    async def intercept_feed(cookies: List[dict] = None, user_agent: str = None, scroll_count: int = 5,
+                             lightweight: bool = True) -> List[dict]:
+        """
+        Navigate to TikTok feed and intercept API responses.
+        lightweight=False loads the page's images/media/fonts/CSS too (slower;
+        only useful when debugging what the page renders).
+        """
         try:
-            return await PlaywrightManager._intercept_feed_impl(cookies, user_agent, scroll_count)
+            return await PlaywrightManager._intercept_feed_impl(cookies, user_agent, scroll_count, lightweight)
         except Exception as e:
-            print(f"DEBUG: Error in intercept_feed: {e}")
-            print(traceback.format_exc())
+            logger.exception("Error in intercept_feed: %s", e)
             raise e
 
     @staticmethod
-    async def _intercept_feed_impl(cookies: List[dict] = None, user_agent: str = None, scroll_count: int = 5) -> List[dict]:
+    async def _intercept_feed_impl(cookies: List[dict] = None, user_agent: str = None, scroll_count: int = 5,
+                                   lightweight: bool = True) -> List[dict]:
         if not cookies:
-            cookies, user_agent = PlaywrightManager.load_stored_credentials()
+            cookies, user_agent = await PlaywrightManager.load_stored_credentials_async()
         
         if not user_agent:
             user_agent = PlaywrightManager.DEFAULT_USER_AGENT
         
         if not cookies:
-            print("DEBUG: No cookies available")
+            logger.info("No cookies available")
             return []
         
-        print(f"DEBUG: Starting network interception with {len(cookies)} cookies (scrolls={scroll_count})")
+        logger.info("Starting network interception with %d cookies (scrolls=%s)", len(cookies), scroll_count)
         
-        captured_videos = []
+        # Captured videos by id, in arrival order
+        captured: Dict[str, dict] = {}
+        # Set once the first batch has been captured
+        first_batch = asyncio.Event()
         
         async def handle_response(response: Response):
             """Capture /item_list API responses."""
-            nonlocal captured_videos
-            
             url = response.url
             
             # Look for TikTok's feed API
-            if "item_list" in url or "recommend/item" in url:
+            if _FEED_URL_RE.search(url) and PlaywrightManager._is_api_json(response):
                 try:
-                    data = await response.json()
+                    data = json_utils.loads(await response.body())
                     
                     # TikTok returns videos in "itemList" or "aweme_list"
-                    items = data.get("itemList", []) or data.get("aweme_list", [])
+                    items, extract = PlaywrightManager._api_items(data, "aweme_list")
                     
-                    for item in items:
-                        video_data = PlaywrightManager._extract_video_data(item)
-                        if video_data:
-                            captured_videos.append(video_data)
+                    PlaywrightManager._capture_items(items, captured, extract=extract)
+                    if captured:
+                        first_batch.set()
                     
-                    print(f"DEBUG: Captured {len(items)} videos from API")
+                    logger.debug("Captured %d videos from API", len(items))
                     
                 except Exception as e:
-                    print(f"DEBUG: Error parsing API response: {e}")
+                    logger.warning("Error parsing API response: %s", e)
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=True,
-                executable_path=PlaywrightManager.CHROME_PATH,
-                args=PlaywrightManager.BROWSER_ARGS
-            )
-            
-            context = await browser.new_context(user_agent=user_agent)
-            
-            if cookies:
-                try:
-                    await context.add_cookies(cookies)
-                    print(f"DEBUG: Applied {len(cookies)} cookies to browser context")
-                except Exception as e:
-                    print(f"DEBUG: Error applying cookies: {e}")
-                    if len(cookies) > 0:
-                        print(f"DEBUG: Sample cookie: {cookies[0]}")
-                    raise e
-            
-            page = await context.new_page()
-            await stealth_async(page)
+        async with PlaywrightManager._acquire_context(user_agent, cookies, lightweight) as context:
+            page = await PlaywrightManager._new_page(context)
             
-            # Set up response listener
-            page.on("response", handle_response)
+            # Set up response listener (handler tasks tracked so we can wait for them)
+            pending = set()
+            is_feed_api = lambda url: bool(_FEED_URL_RE.search(url))
+            PlaywrightManager._listen(page, pending, handle_response, is_api_url=is_feed_api)
             
             try:
                 # Navigate to For You page
@@ -561,199 +1099,374 @@ class PlaywrightManager:
                     timeout=30000
                 )
                 
-                # Wait for initial load - ensure we capture at least one batch
-                # Poll for videos if in fast mode
-                for _ in range(10): # Max 10 seconds wait
-                    if len(captured_videos) > 0:
-                        break
-                    await asyncio.sleep(1)
+                # Wait for initial load - ensure we capture at least one batch.
+                # Wakes the moment it is parsed rather than on a 1s poll tick
+                try:
+                    await asyncio.wait_for(first_batch.wait(), timeout=10)  # Max 10 seconds wait
+                except asyncio.TimeoutError:
+                    pass
                 
                 # If still no videos, maybe scroll once to trigger
-                if len(captured_videos) == 0:
-                    print("DEBUG: No videos after initial load, scrolling once...")
-                    await page.evaluate("window.scrollBy(0, 800)")
-                    await asyncio.sleep(2)
+                if not captured:
+                    logger.info("No videos after initial load, scrolling once...")
+                    await PlaywrightManager._scroll_and_wait(page, 800, is_feed_api, timeout=2.0)
                 
-                # Scroll loop
+                # Scroll loop - move on as soon as the next batch arrives, and
+                # stop once scrolling no longer loads one (end of feed or throttled)
                 for i in range(scroll_count):
-                    await page.evaluate("window.scrollBy(0, 800)")
-                    await asyncio.sleep(1)
+                    if not await PlaywrightManager._scroll_and_wait(page, 800, is_feed_api, timeout=1.5):
+                        break
                 
-                # Give time for API responses to be captured
-                await asyncio.sleep(2)
+                # Give in-flight API responses time to be captured
+                await PlaywrightManager._settle(pending, timeout=2.0)
                 
             except Exception as e:
-                print(f"DEBUG: Navigation error: {e}")
-            
-            await browser.close()
+                logger.warning("Navigation error: %s", e)
         
-        print(f"DEBUG: Total captured videos: {len(captured_videos)}")
+        captured_videos = list(captured.values())
+        logger.info("Total captured videos: %d", len(captured_videos))
         return captured_videos
 
+    @staticmethod
+    def _listen(page, pending: set, handler, done=None, is_api_url=None):
+        """
+        Dispatch page responses to handler as tracked tasks. Responses whose
+        URL fails is_api_url (scripts, documents, analytics - nearly all of
+        them) are dropped right in the listener, without creating a task.
+        Once done() is true the listener removes itself, so later
+        scroll-triggered responses aren't dispatched or parsed at all.
+        """
+        def listener(response):
+            if is_api_url is not None and not is_api_url(response.url):
+                return
+            if done is not None and done():
+                page.remove_listener("response", listener)
+                return
+            PlaywrightManager._track(pending, handler(response))
+        page.on("response", listener)
+
+    @staticmethod
+    def _track(pending: set, coro):
+        """Run a response handler as a task, kept in `pending` until it finishes."""
+        task = asyncio.ensure_future(coro)
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    @staticmethod
+    async def _settle(pending: set, timeout: float):
+        """Wait (at most timeout seconds) for the tracked response handlers to finish."""
+        if pending:
+            await asyncio.wait(list(pending), timeout=timeout)
+
+    @staticmethod
+    async def _scroll_and_wait(page, distance: int, is_api_url, timeout: float):
+        """
+        Scroll, then wait for the next response whose URL passes is_api_url -
+        returning as soon as it arrives instead of sleeping out the full timeout.
+        Returns False if no such response came within the timeout.
+        """
+        try:
+            async with page.expect_response(lambda r: is_api_url(r.url), timeout=timeout * 1000):
+                await page.evaluate(f"window.scrollBy(0, {distance})")
+        except PlaywrightTimeoutError:
+            return False
+        return True
+
+    @staticmethod
+    def _api_items(data: dict, *fallback_keys: str) -> tuple:
+        """
+        (items, extractor) for an API response. All items of a response share
+        one schema, so it is picked once per batch: web "itemList" responses
+        get _extract_web_video, anything else the general extractor.
+        """
+        items = data.get("itemList")
+        if items:
+            return items, PlaywrightManager._extract_web_video
+        for key in fallback_keys:
+            items = data.get(key)
+            if items:
+                return items, PlaywrightManager._extract_video_data
+        return [], PlaywrightManager._extract_video_data
+
+    @staticmethod
+    def _capture_items(items: list, captured: Dict[str, dict], limit: Optional[int] = None, extract=None):
+        """
+        Extract a batch of API items into `captured` (videos by id), stopping
+        once it holds `limit` videos. Ids already captured are skipped before
+        extraction, since TikTok re-sends videos across batches.
+        Runs inline on the event loop on purpose: extraction is a few dict
+        lookups per item on already-parsed data, so handing a batch to an
+        executor would cost more in the thread hop than it saves and still
+        hold the GIL while it runs.
+        """
+        extract = extract or PlaywrightManager._extract_video_data
+        if limit is not None and len(captured) >= limit:
+            return
+        for item in items:
+            if isinstance(item, dict):
+                vid = item.get("id") or item.get("aweme_id")
+                if vid and str(vid) in captured:
+                    continue
+            video_data = extract(item)
+            if video_data:
+                captured[video_data["id"]] = video_data
+                # The count only changes here, so only check the limit here
+                if limit is not None and len(captured) >= limit:
+                    break
+
+    @staticmethod
+    def _extract_web_video(item: dict) -> Optional[dict]:
+        """
+        _extract_video_data for web-schema items (itemList): same result, but
+        only the web keys (camelCase stats, cover/playAddr, bitrateInfo) are
+        looked at. Whenever one of them comes up empty - no web "id", author
+        uniqueId, desc, cover, play URL or stats - the item goes through the
+        general path instead, so its fallback keys (ai_dynamic_cover,
+        play_addr/download_addr, description, ...) still apply.
+        """
+        if not isinstance(item, dict) or not item.get("id"):
+            return PlaywrightManager._extract_video_data(item)
+        try:
+            get = item.get
+            video_id = get("id")
+            author = (get("author") or {}).get("uniqueId")
+            desc = get("desc")
+            video_get = (get("video") or {}).get
+            thumbnail = video_get("cover") or video_get("dynamicCover") or video_get("originCover")
+            bitrate_info = video_get("bitrateInfo")
+            cdn_url = (
+                video_get("playAddr")
+                or video_get("downloadAddr")
+                or (PlaywrightManager._first_url(bitrate_info[0].get("PlayAddr"), "UrlList")
+                    if bitrate_info and isinstance(bitrate_info[0], dict) else None)
+            )
+            stats = get("stats") or {}
+            views = stats.get("playCount")
+            likes = stats.get("diggCount")
+            # Anything missing here might still be found under a fallback key
+            if not (author and desc and thumbnail and cdn_url and views and likes):
+                return PlaywrightManager._extract_video_data(item)
+            
+            result = {
+                "id": str(video_id),
+                "url": f"https://www.tiktok.com/@{author}/video/{video_id}",
+                "author": author,
+                "description": desc[:200],
+                "thumbnail": thumbnail,
+                "cdn_url": cdn_url,
+                "views": views,
+                "likes": likes,
+            }
+            if get("products") or get("commerce_info") or get("poi_info"):
+                result["has_product"] = True
+            return result
+        
+        except Exception as e:
+            logger.warning("Error extracting video data: %s", e)
+        
+        return None
+
     @staticmethod
     def _extract_video_data(item: dict) -> Optional[dict]:
         """Extract video data from TikTok API item, including product/shop videos."""
         try:
             if not isinstance(item, dict):
-                print(f"DEBUG: Skipping invalid item (type: {type(item)})")
+                logger.debug("Skipping invalid item (type: %s)", type(item))
                 return None
+            
+            # Bound .get methods: this runs for every captured item, and each
+            # field below falls back across several keys
+            get = item.get
+            first_url = PlaywrightManager._first_url
 
             # Handle different API response formats
-            video_id = item.get("id") or item.get("aweme_id")
+            video_id = get("id") or get("aweme_id")
+            if not video_id:
+                return None
             
             # Get author info
-            author_data = item.get("author", {})
-            author = author_data.get("uniqueId") or author_data.get("unique_id") or "unknown"
+            author_get = (get("author") or {}).get
+            author = author_get("uniqueId") or author_get("unique_id") or "unknown"
             
             # Get description
-            desc = item.get("desc") or item.get("description") or ""
+            desc = get("desc") or get("description") or ""
             
             # Check if this is a product/shop video
-            is_shop_video = bool(item.get("products") or item.get("commerce_info") or item.get("poi_info"))
-            
-            # Get thumbnail/cover image
-            thumbnail = None
-            video_data = item.get("video", {})
-            
-            # Try different thumbnail sources
-            thumbnail_sources = [
-                video_data.get("cover"),
-                video_data.get("dynamicCover"),
-                video_data.get("originCover"),
-                video_data.get("ai_dynamic_cover", {}).get("url_list", [None])[0] if isinstance(video_data.get("ai_dynamic_cover"), dict) else None,
-            ]
-            for src in thumbnail_sources:
-                if src:
-                    thumbnail = src
-                    break
+            is_shop_video = bool(get("products") or get("commerce_info") or get("poi_info"))
+            
+            video_get = (get("video") or {}).get
+            
+            # Get thumbnail/cover image - first available source wins, so
+            # later (more expensive) sources are only looked at when needed.
+            # Inline `or` chains rather than a table of accessor lambdas: both
+            # short-circuit, but the chain runs without a Python call per
+            # source (several times faster per field)
+            thumbnail = (
+                video_get("cover")
+                or video_get("dynamicCover")
+                or video_get("originCover")
+                or first_url(video_get("ai_dynamic_cover"), "url_list")
+            )
             
             # Get direct CDN URL - try multiple sources (including for shop videos)
-            cdn_url = None
-            cdn_sources = [
+            bitrate_info = video_get("bitrateInfo")
+            cdn_url = (
                 # Standard sources
-                video_data.get("playAddr"),
-                video_data.get("downloadAddr"),
+                video_get("playAddr")
+                or video_get("downloadAddr")
                 # Bit rate sources (often works for shop videos)
-                video_data.get("bitrateInfo", [{}])[0].get("PlayAddr", {}).get("UrlList", [None])[0] if video_data.get("bitrateInfo") else None,
+                or (first_url(bitrate_info[0].get("PlayAddr"), "UrlList")
+                    if bitrate_info and isinstance(bitrate_info[0], dict) else None)
                 # Play URL list
-                video_data.get("play_addr", {}).get("url_list", [None])[0] if isinstance(video_data.get("play_addr"), dict) else None,
+                or first_url(video_get("play_addr"), "url_list")
                 # Download URL list
-                video_data.get("download_addr", {}).get("url_list", [None])[0] if isinstance(video_data.get("download_addr"), dict) else None,
-            ]
-            
-            for src in cdn_sources:
-                if src:
-                    cdn_url = src
-                    break
-            
-            # Use TikTok page URL as fallback (yt-dlp resolves this)
-            video_url = f"https://www.tiktok.com/@{author}/video/{video_id}"
+                or first_url(video_get("download_addr"), "url_list")
+            )
             
             # Get stats (views, likes)
-            stats = item.get("stats", {}) or item.get("statistics", {})
-            views = stats.get("playCount") or stats.get("play_count") or 0
-            likes = stats.get("diggCount") or stats.get("digg_count") or 0
-            
-            if video_id and author:
-                result = {
-                    "id": str(video_id),
-                    "url": video_url,
-                    "author": author,
-                    "description": desc[:200] if desc else f"Video by @{author}"
-                }
-                if thumbnail:
-                    result["thumbnail"] = thumbnail
-                if cdn_url:
-                    result["cdn_url"] = cdn_url  # Direct CDN URL for thin proxy
-                if views:
-                    result["views"] = views
-                if likes:
-                    result["likes"] = likes
-                if is_shop_video:
-                    result["has_product"] = True  # Flag for product videos
-                return result
+            stats_get = (get("stats") or get("statistics") or {}).get
+            views = stats_get("playCount") or stats_get("play_count") or 0
+            likes = stats_get("diggCount") or stats_get("digg_count") or 0
+            
+            result = {
+                "id": str(video_id),
+                # Use TikTok page URL as fallback (yt-dlp resolves this)
+                "url": f"https://www.tiktok.com/@{author}/video/{video_id}",
+                "author": author,
+                "description": desc[:200] if desc else f"Video by @{author}"
+            }
+            if thumbnail:
+                result["thumbnail"] = thumbnail
+            if cdn_url:
+                result["cdn_url"] = cdn_url  # Direct CDN URL for thin proxy
+            if views:
+                result["views"] = views
+            if likes:
+                result["likes"] = likes
+            if is_shop_video:
+                result["has_product"] = True  # Flag for product videos
+            return result
         
         except Exception as e:
-            print(f"DEBUG: Error extracting video data: {e}")
+            logger.warning("Error extracting video data: %s", e)
         
         return None
 
+    @staticmethod
+    def _is_api_json(response: Response) -> bool:
+        """True for successful XHR/fetch JSON responses - checked before pulling a body across from the browser."""
+        if response.request.resource_type not in ("xhr", "fetch"):
+            return False
+        # Error/redirect/empty responses carry no item list worth a body round-trip
+        if response.status != 200:
+            return False
+        headers = response.headers
+        if "json" not in headers.get("content-type", ""):
+            return False
+        # 200s can still be tiny {"statusCode": ...} error bodies; chunked
+        # responses have no length and are always read
+        length = headers.get("content-length")
+        return not (length and length.isdigit() and int(length) < PlaywrightManager.MIN_API_BODY_BYTES)
+
+    @staticmethod
+    def _first_url(data: Any, key: str) -> Optional[str]:
+        """First entry of data[key] when data is a dict holding a non-empty URL list."""
+        if isinstance(data, dict):
+            urls = data.get(key)
+            if urls:
+                return urls[0]
+        return None
+
+    @staticmethod
+    def get_cached_user_videos(username: str, limit: int) -> Optional[list]:
+        """A copy of the cached video list for (username, limit), or None."""
+        cached = PlaywrightManager._user_videos_cache.get((username.lower(), limit))
+        return list(cached) if cached is not None else None
+
+    @staticmethod
+    def cache_user_videos(username: str, limit: int, videos: list):
+        """Cache a copy of videos for (username, limit); empty lists are skipped."""
+        # Empty is usually a failed or blocked fetch
+        if videos:
+            PlaywrightManager._user_videos_cache[(username.lower(), limit)] = list(videos)
+
     @staticmethod
     async def fetch_user_videos(username: str, cookies: list, user_agent: str = None, limit: int = 10) -> list:
         """
         Fetch videos from a specific user's profile page.
         Uses Playwright to intercept the user's video list API.
         """
-        from playwright.async_api import async_playwright, Response
         
         if not user_agent:
             user_agent = PlaywrightManager.DEFAULT_USER_AGENT
         
         if not cookies:
-            print("DEBUG: No cookies available for user videos")
+            logger.info("No cookies available for user videos")
             return []
         
-        print(f"DEBUG: Fetching videos for @{username}...")
+        cached = PlaywrightManager.get_cached_user_videos(username, limit)
+        if cached is not None:
+            logger.debug("Using cached videos for @%s", username)
+            return cached
+        
+        logger.info("Fetching videos for @%s...", username)
         
-        captured_videos = []
+        # Captured videos by id, in arrival order
+        captured: Dict[str, dict] = {}
         
         async def handle_response(response: Response):
             """Capture user's video list API responses."""
-            nonlocal captured_videos
-            
+            # Already full (listener not detached yet) - don't pull the body
+            if len(captured) >= limit:
+                return
             url = response.url
             
             # Look for user's video list API
-            if "item_list" in url or "post/item_list" in url:
+            if "item_list" in url and PlaywrightManager._is_api_json(response):
                 try:
-                    data = await response.json()
+                    data = json_utils.loads(await response.body())
                     
-                    items = data.get("itemList", []) or data.get("aweme_list", [])
+                    items, extract = PlaywrightManager._api_items(data, "aweme_list")
                     
-                    for item in items:
-                        if len(captured_videos) >= limit:
-                            break
-                        video_data = PlaywrightManager._extract_video_data(item)
-                        if video_data:
-                            captured_videos.append(video_data)
+                    PlaywrightManager._capture_items(items, captured, limit, extract)
                     
-                    print(f"DEBUG: Captured {len(items)} videos from user API")
+                    logger.debug("Captured %d videos from user API", len(items))
                     
                 except Exception as e:
-                    print(f"DEBUG: Error parsing user API response: {e}")
+                    logger.warning("Error parsing user API response: %s", e)
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=True,
-                executable_path=PlaywrightManager.CHROME_PATH,
-                args=PlaywrightManager.BROWSER_ARGS
-            )
-            
-            context = await browser.new_context(user_agent=user_agent)
-            await context.add_cookies(cookies)
-            
-            page = await context.new_page()
-            await stealth_async(page)
-            page.on("response", handle_response)
+        async with PlaywrightManager._acquire_context(user_agent, cookies) as context:
+            page = await PlaywrightManager._new_page(context)
+            pending = set()
+            is_list_api = lambda url: "item_list" in url
+            PlaywrightManager._listen(page, pending, handle_response,
+                                      done=lambda: len(captured) >= limit, is_api_url=is_list_api)
             
             try:
                 # Navigate to user's profile page
+                # Only the video list XHR matters, so don't wait for networkidle
+                # (TikTok keeps sockets busy) - block until that response instead
                 profile_url = f"https://www.tiktok.com/@{username}"
-                await page.goto(profile_url, wait_until="networkidle", timeout=30000)
+                try:
+                    async with page.expect_response(lambda r: is_list_api(r.url), timeout=10000):
+                        await page.goto(profile_url, wait_until="commit", timeout=30000)
+                except PlaywrightTimeoutError:
+                    logger.warning("No video list response for @%s yet", username)
                 
-                # Wait for videos to load
-                await asyncio.sleep(2)
+                # Wait for the video list responses seen so far to be parsed
+                await PlaywrightManager._settle(pending, timeout=2.0)
                 
                 # Scroll a bit to trigger more video loading
-                await page.evaluate("window.scrollBy(0, 500)")
-                await asyncio.sleep(1)
+                if len(captured) < limit:
+                    await PlaywrightManager._scroll_and_wait(page, 500, is_list_api, timeout=1.0)
+                    await PlaywrightManager._settle(pending, timeout=1.0)
                 
             except Exception as e:
-                print(f"DEBUG: Error navigating to profile: {e}")
-            
-            await browser.close()
+                logger.warning("Error navigating to profile: %s", e)
         
-        print(f"DEBUG: Total captured user videos: {len(captured_videos)}")
+        captured_videos = list(captured.values())
+        logger.info("Total captured user videos: %d", len(captured_videos))
+        PlaywrightManager.cache_user_videos(username, limit, captured_videos)
         return captured_videos
 
     @staticmethod
@@ -769,74 +1482,59 @@ class PlaywrightManager:
             limit: Max videos to capture in this batch
             cursor: Starting offset for pagination
         """
-        from playwright.async_api import async_playwright, Response
-        from urllib.parse import quote
         
         if not user_agent:
             user_agent = PlaywrightManager.DEFAULT_USER_AGENT
         
         if not cookies:
-            print("DEBUG: No cookies available for search")
+            logger.info("No cookies available for search")
             return []
         
-        print(f"DEBUG: Searching for '{query}' (limit={limit}, cursor={cursor})...")
+        logger.info("Searching for '%s' (limit=%s, cursor=%s)...", query, limit, cursor)
         
-        captured_videos = []
+        # Captured videos by id, in arrival order
+        captured: Dict[str, dict] = {}
         
         async def handle_response(response: Response):
             """Capture search results API responses."""
-            nonlocal captured_videos
-            
+            # Already full (listener not detached yet) - don't pull the body
+            if len(captured) >= limit:
+                return
             url = response.url
             
             # Look for search results API
-            if "search" in url and ("item_list" in url or "video" in url or "general" in url):
+            if "search" in url and _SEARCH_URL_RE.search(url) and PlaywrightManager._is_api_json(response):
                 try:
-                    data = await response.json()
+                    data = json_utils.loads(await response.body())
                     
                     # Try different response formats
-                    items = data.get("itemList", []) or data.get("data", []) or data.get("item_list", [])
+                    items, extract = PlaywrightManager._api_items(data, "data", "item_list")
                     
-                    for item in items:
-                        # If we have enough for this specific batch, we don't need more
-                        if len(captured_videos) >= limit:
-                            break
-                        
-                        video_data = PlaywrightManager._extract_video_data(item)
-                        if video_data:
-                            # Avoid duplicates within the same capture session
-                            if not any(v['id'] == video_data['id'] for v in captured_videos):
-                                captured_videos.append(video_data)
+                    # If we have enough for this specific batch, we don't need more
+                    PlaywrightManager._capture_items(items, captured, limit, extract)
                     
-                    print(f"DEBUG: Captured {len(items)} videos from search API (Total batch: {len(captured_videos)})")
+                    logger.debug("Captured %d videos from search API (Total batch: %d)", len(items), len(captured))
                     
                 except Exception as e:
-                    print(f"DEBUG: Error parsing search API response: {e}")
+                    logger.warning("Error parsing search API response: %s", e)
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=True,
-                executable_path=PlaywrightManager.CHROME_PATH,
-                args=PlaywrightManager.BROWSER_ARGS
-            )
-            
-            context = await browser.new_context(user_agent=user_agent)
-            await context.add_cookies(cookies)
-            
-            page = await context.new_page()
-            await stealth_async(page)
-            page.on("response", handle_response)
+        async with PlaywrightManager._acquire_context(user_agent, cookies) as context:
+            page = await PlaywrightManager._new_page(context)
+            pending = set()
+            is_search_api = lambda url: "search" in url and bool(_SEARCH_URL_RE.search(url))
+            PlaywrightManager._listen(page, pending, handle_response,
+                                      done=lambda: len(captured) >= limit, is_api_url=is_search_api)
             
             try:
                 # Navigate to TikTok search page
-                search_url = f"https://www.tiktok.com/search/video?q={quote(query)}"
+                search_url = PlaywrightManager.SEARCH_PAGE_URL + quote(query, safe="")
+                # Wait for initial results: the first search API response
+                # rather than DOM load plus a fixed delay
                 try:
-                    await page.goto(search_url, wait_until="domcontentloaded", timeout=15000)
-                except:
-                    print("DEBUG: Navigation timeout, proceeding anyway")
-                
-                # Wait for initial results
-                await asyncio.sleep(3)
+                    async with page.expect_response(lambda r: is_search_api(r.url), timeout=10000):
+                        await page.goto(search_url, wait_until="commit", timeout=15000)
+                except Exception:
+                    logger.warning("Navigation timeout, proceeding anyway")
                 
                 # Scroll based on cursor to reach previous results and then capture new ones
                 # Each scroll typically loads 12-20 items
@@ -845,25 +1543,34 @@ class PlaywrightManager:
                 # Limit total scrolls to avoid hanging
                 scroll_count = min(scroll_count, 10)
                 
+                # A scroll that loads no results means the end of them - stop
+                # there rather than timing out every remaining scroll
+                exhausted = False
                 for i in range(scroll_count):
-                    await page.evaluate("window.scrollBy(0, 1500)")
-                    await asyncio.sleep(1.5)
+                    if len(captured) >= limit:
+                        break
+                    if not await PlaywrightManager._scroll_and_wait(page, 1500, is_search_api, timeout=1.5):
+                        exhausted = True
+                        break
                 
                 # After reaching the offset, scroll a bit more to trigger the specific batch capture
-                batch_scrolls = (limit // 10) + 2  # Add extra scrolls to be safe
+                batch_scrolls = 0 if exhausted else (limit // 10) + 2  # Add extra scrolls to be safe
                 for _ in range(batch_scrolls):
-                    await page.evaluate("window.scrollBy(0, 2000)")  # Larger scroll
-                    await asyncio.sleep(1.0) # Faster scroll cadence
+                    # Batch already full - further scrolls would only be ignored
+                    if len(captured) >= limit:
+                        break
+                    # Larger scroll, faster cadence
+                    if not await PlaywrightManager._scroll_and_wait(page, 2000, is_search_api, timeout=1.0):
+                        break
                 
-                # Wait a bit after scrolling for all responses to settle
-                await asyncio.sleep(2.5)
+                # Wait for in-flight responses to be captured
+                await PlaywrightManager._settle(pending, timeout=2.5)
                 
             except Exception as e:
-                print(f"DEBUG: Error during search: {e}")
-            
-            await browser.close()
+                logger.warning("Error during search: %s", e)
         
-        print(f"DEBUG: Total captured search videos in this batch: {len(captured_videos)}")
+        captured_videos = list(captured.values())
+        logger.info("Total captured search videos in this batch: %d", len(captured_videos))
         return captured_videos
 
     @staticmethod
@@ -872,23 +1579,20 @@ class PlaywrightManager:
         Fetch trending/suggested accounts from TikTok Vietnam.
         Uses the discover/creators API.
         """
-        from playwright.async_api import async_playwright, Response
         
         if not user_agent:
             user_agent = PlaywrightManager.DEFAULT_USER_AGENT
         
-        captured_accounts = []
+        # Captured accounts by username, in arrival order
+        captured_accounts: Dict[str, dict] = {}
+        pending = set()
         
         async def handle_response(response: Response):
             """Capture suggested accounts from API responses."""
-            nonlocal captured_accounts
-            
-            url = response.url
-            
-            # Look for suggest/discover APIs
-            if any(x in url for x in ["suggest", "discover", "recommend/user", "creator"]):
+            # Suggest/discover API URLs are filtered in the listener
+            if PlaywrightManager._is_api_json(response):
                 try:
-                    data = await response.json()
+                    data = json_utils.loads(await response.body())
                     
                     # Different API formats
                     users = data.get("userList", []) or data.get("users", []) or data.get("data", [])
@@ -897,68 +1601,76 @@ class PlaywrightManager:
                         user_data = item.get("user", item) if isinstance(item, dict) else item
                         if isinstance(user_data, dict):
                             username = user_data.get("uniqueId") or user_data.get("unique_id")
-                            if username:
-                                captured_accounts.append({
+                            # Suggestions repeat across pages - only build each account once
+                            if username and username not in captured_accounts:
+                                captured_accounts[username] = {
                                     "username": username,
                                     "nickname": user_data.get("nickname", username),
                                     "avatar": user_data.get("avatarThumb") or user_data.get("avatar"),
                                     "followers": user_data.get("followerCount", 0),
                                     "verified": user_data.get("verified", False),
                                     "region": "VN"
-                                })
+                                }
                     
                     if users:
-                        print(f"DEBUG: Captured {len(users)} suggested accounts")
+                        logger.debug("Captured %d suggested accounts", len(users))
                         
                 except Exception as e:
-                    pass  # Ignore parse errors
+                    # Non-fatal - other suggestion responses still count
+                    logger.debug("Error parsing suggested accounts response: %s", e)
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=True,
-                executable_path=PlaywrightManager.CHROME_PATH,
-                args=PlaywrightManager.BROWSER_ARGS
-            )
-            
-            context = await browser.new_context(
-                user_agent=user_agent,
-                locale="vi-VN",  # Vietnamese locale
-                timezone_id="Asia/Ho_Chi_Minh"
-            )
-            await context.add_cookies(cookies)
-            
-            page = await context.new_page()
-            await stealth_async(page)
-            page.on("response", handle_response)
+        async with PlaywrightManager._acquire_context(
+            user_agent,
+            cookies,
+            locale="vi-VN",  # Vietnamese locale
+            timezone_id="Asia/Ho_Chi_Minh"
+        ) as context:
+            is_suggested_api = lambda url: bool(_SUGGESTED_URL_RE.search(url))
             
-            try:
-                # Navigate to TikTok explore/discover page (Vietnam)
-                await page.goto("https://www.tiktok.com/explore?lang=vi-VN", wait_until="networkidle", timeout=30000)
-                await asyncio.sleep(3)
+            async def visit(page_url: str):
+                """Load one page on its own tab and scroll it for suggestions."""
+                page = await PlaywrightManager._new_page(context)
+                # Each suggestion response is parsed in its own tracked task, so
+                # back-to-back responses are read concurrently
+                PlaywrightManager._listen(page, pending, handle_response, is_api_url=is_suggested_api)
                 
-                # Also try the For You page to capture suggested
-                await page.goto("https://www.tiktok.com/foryou?lang=vi-VN", wait_until="domcontentloaded", timeout=15000)
-                await asyncio.sleep(2)
+                # Don't wait on page load: the navigation only commits, then
+                # waits for the first suggestion API response instead of a
+                # fixed delay
+                try:
+                    async with page.expect_response(lambda r: is_suggested_api(r.url), timeout=8000):
+                        await page.goto(page_url, wait_until="commit", timeout=15000)
+                except PlaywrightTimeoutError:
+                    logger.debug("No suggestion response from %s yet", page_url)
                 
-                # Scroll to trigger more suggestions
+                # Scroll to trigger more suggestions - each scroll moves on once
+                # the next suggestion response arrives, and the first one that
+                # loads nothing ends the loop instead of a fixed 1s pause each
                 for _ in range(3):
-                    await page.evaluate("window.scrollBy(0, 800)")
-                    await asyncio.sleep(1)
+                    if not await PlaywrightManager._scroll_and_wait(page, 800, is_suggested_api, timeout=1.0):
+                        break
+            
+            try:
+                # TikTok explore/discover page (Vietnam) and the For You page,
+                # on two tabs of the same context (same cookies) at once - the
+                # waits are network-bound and independent
+                results = await asyncio.gather(
+                    visit("https://www.tiktok.com/explore?lang=vi-VN"),
+                    visit("https://www.tiktok.com/foryou?lang=vi-VN"),
+                    return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        logger.warning("Error fetching suggested accounts: %s", result)
+                
+                # Let responses still being read land before the context closes
+                await PlaywrightManager._settle(pending, timeout=2.0)
                 
             except Exception as e:
-                print(f"DEBUG: Error fetching suggested accounts: {e}")
-            
-            await browser.close()
-        
-        # Remove duplicates by username
-        seen = set()
-        unique_accounts = []
-        for acc in captured_accounts:
-            if acc["username"] not in seen:
-                seen.add(acc["username"])
-                unique_accounts.append(acc)
+                logger.warning("Error fetching suggested accounts: %s", e)
         
-        print(f"DEBUG: Total unique suggested accounts: {len(unique_accounts)}")
+        unique_accounts = list(captured_accounts.values())
+        logger.info("Total unique suggested accounts: %d", len(unique_accounts))
         return unique_accounts[:limit]
 
 
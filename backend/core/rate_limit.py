@@ -0,0 +1,59 @@
+"""
+Async token-bucket rate limiting for outbound API calls, one bucket per host.
+"""
+
+import asyncio
+import os
+import time
+from typing import Dict
+
+# Requests per second (sustained) and burst size for each upstream host
+DEFAULT_RATE = float(os.getenv("TIKTOK_API_RATE", "10"))
+DEFAULT_BURST = int(os.getenv("TIKTOK_API_BURST", "20"))
+
+
+class TokenBucket:
+    """
+    Token bucket: holds up to `burst` tokens, refilled at `rate` per second.
+    Use as `async with bucket:` around a request; waits until a token is free.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        # Waiters queue on the lock, so tokens are handed out in arrival order
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Take one token, sleeping until one is available."""
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+_buckets: Dict[str, TokenBucket] = {}
+
+
+def limiter_for(host: str) -> TokenBucket:
+    """Shared token bucket for a host (created on first use)."""
+    bucket = _buckets.get(host)
+    if bucket is None:
+        bucket = _buckets[host] = TokenBucket()
+    return bucket
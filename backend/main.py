@@ -5,25 +5,62 @@ from fastapi.responses import FileResponse
 from contextlib import asynccontextmanager
 from pathlib import Path
 from api.routes import auth, feed, download, following, config, user
+from core.compression import GZipMiddleware
+from core.logging_setup import setup_logging, stop_logging
+from core.playwright_manager import PlaywrightManager
+import logging
+import os
 import sys
 import asyncio
 
+# Handlers log via a queue; a background thread does the stdout writes
+setup_logging()
+logger = logging.getLogger(__name__)
+
 # Force Proactor on Windows for Playwright
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
+async def warm_browser():
+    """Pre-launch the scraping browser and context pool (PW_WARMUP_CONTEXTS)."""
+    try:
+        await PlaywrightManager.warm_up(PlaywrightManager.WARMUP_CONTEXTS)
+    except Exception as e:
+        logger.warning("Browser warm-up failed (non-critical): %s", e)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events."""
-    print("🚀 Starting PureStream API (Network Interception Mode)...")
+    logger.info("🚀 Starting PureStream API (Network Interception Mode)...")
     import asyncio
     try:
         loop = asyncio.get_running_loop()
-        print(f"DEBUG: Running event loop: {type(loop)}")
+        logger.debug("Running event loop: %s", type(loop))
     except Exception as e:
-        print(f"DEBUG: Could not get running loop: {e}")
+        logger.debug("Could not get running loop: %s", e)
+    
+    # Evict proxy cache entries in the background, off the request path
+    janitor = asyncio.create_task(feed.cache_janitor())
+    # Warm the browser in the background - startup doesn't wait on Chromium
+    warmup = asyncio.create_task(warm_browser())
+    
     yield
-    print("👋 Shutting down PureStream API...")
+    
+    logger.info("👋 Shutting down PureStream API...")
+    for task in (janitor, warmup):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    await feed.close_cdn_client()
+    await user.close_api_client()
+    await PlaywrightManager.shutdown()
+    # Only close the feed crawler if something imported (and so may have started) it
+    feed_service_module = sys.modules.get("core.feed_service")
+    if feed_service_module is not None:
+        await feed_service_module.FeedService.close_crawler()
+    stop_logging()
 
 import asyncio
 import sys
@@ -34,15 +71,32 @@ if __name__ == "__main__":
     if sys.platform == "win32":
         try:
             loop = asyncio.get_event_loop()
-            print(f"DEBUG: Current event loop: {type(loop)}")
+            logger.debug("Current event loop: %s", type(loop))
         except:
-             print("DEBUG: No event loop yet")
+             logger.debug("No event loop yet")
              
 
-# CORS middleware
+# Compress JSON (search/feed payloads run to tens of KB) and the SPA bundle.
+# Streamed responses (the NDJSON profile stream) and media pass through, and
+# the video proxy/download routes are skipped whatever content type upstream
+# reports - MP4 doesn't compress, and ranges must match the raw bytes.
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=1024,
+    exclude_paths=("/api/feed/proxy", "/api/feed/thin-proxy", "/api/download/file"),
+)
+
+# CORS middleware - the built frontend is served from this origin, so only
+# other origins (the Vite dev server by default) need listing. No "*": with
+# allow_credentials it would let any site make credentialed calls.
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:5173,http://127.0.0.1:5173").split(",")
+    if origin.strip()
+]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:5173", "http://127.0.0.1:5173", "*"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -60,11 +114,19 @@ app.include_router(user.router, prefix="/api/user", tags=["User"])
 async def health_check():
     return {"status": "ok"}
 
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles for Vite's content-hashed build assets: a changed file gets a new name, so cache forever."""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
 # Serve static frontend files in production
 FRONTEND_DIR = Path(__file__).parent.parent / "frontend" / "dist"
 if FRONTEND_DIR.exists():
     # Mount static assets
-    app.mount("/assets", StaticFiles(directory=FRONTEND_DIR / "assets"), name="assets")
+    app.mount("/assets", ImmutableStaticFiles(directory=FRONTEND_DIR / "assets"), name="assets")
     
     # Serve index.html for all non-API routes (SPA fallback)
     @app.get("/{full_path:path}")
@@ -73,10 +135,16 @@ if FRONTEND_DIR.exists():
         file_path = FRONTEND_DIR / full_path
         if file_path.is_file():
             return FileResponse(file_path)
-        # Otherwise serve index.html for SPA routing
-        return FileResponse(FRONTEND_DIR / "index.html")
+        # Otherwise serve index.html for SPA routing. It names the current
+        # hashed assets, so browsers must revalidate it (ETag/Last-Modified)
+        return FileResponse(FRONTEND_DIR / "index.html", headers={"Cache-Control": "no-cache"})
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8002, reload=False, loop="asyncio")
+    # Windows needs the Proactor asyncio loop for Playwright's subprocesses;
+    # elsewhere "auto" picks uvloop (and http "auto" httptools) when installed.
+    # One worker only: the browser pool, caches and admin sessions are all
+    # per-process state.
+    uvicorn.run("main:app", host="0.0.0.0", port=8002, reload=False,
+                loop="asyncio" if sys.platform == "win32" else "auto")
 
@@ -1,11 +1,18 @@
 import sys
 import os
 import asyncio
+import logging
+
+from core.logging_setup import setup_logging
+
+# Same queue-backed logging main.py sets up (setup_logging is idempotent)
+setup_logging()
+logger = logging.getLogger("run_server")
 
 # Fix sys.path for user site-packages where pip installed dependencies
 user_site = os.path.expanduser("~\\AppData\\Roaming\\Python\\Python312\\site-packages")
 if os.path.exists(user_site) and user_site not in sys.path:
-    print(f"DEBUG: Adding user site-packages to path: {user_site}")
+    logger.debug("Adding user site-packages to path: %s", user_site)
     sys.path.append(user_site)
 
 # Enforce ProactorEventLoopPolicy for Playwright on Windows
@@ -14,12 +21,16 @@ if sys.platform == "win32":
     # Check if policy is already set
     current_policy = asyncio.get_event_loop_policy()
     if not isinstance(current_policy, asyncio.WindowsProactorEventLoopPolicy):
-        print("DEBUG: Setting WindowsProactorEventLoopPolicy")
+        logger.debug("Setting WindowsProactorEventLoopPolicy")
         asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
     else:
-        print("DEBUG: WindowsProactorEventLoopPolicy already active")
+        logger.debug("WindowsProactorEventLoopPolicy already active")
 
 if __name__ == "__main__":
     import uvicorn
-    print("🚀 Bootstrapping Uvicorn with Proactor Loop (Reload Disabled)...")
-    uvicorn.run("main:app", host="0.0.0.0", port=8002, reload=False, loop="asyncio")
+    # uvloop (loop="auto") is used where it's available - never on Windows,
+    # which keeps the Proactor loop. A single worker, since the browser pool
+    # and caches live in this process.
+    loop = "asyncio" if sys.platform == "win32" else "auto"
+    logger.info("🚀 Bootstrapping Uvicorn (loop=%s, reload disabled)...", loop)
+    uvicorn.run("main:app", host="0.0.0.0", port=8002, reload=False, loop=loop)
@@ -0,0 +1,94 @@
+import asyncio
+import gzip
+import unittest
+
+from core.compression import GZipMiddleware
+
+
+def _scope(path="/api/user/profiles/stream"):
+    return {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "headers": [(b"accept-encoding", b"gzip, deflate")],
+    }
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+class GZipMiddlewareTest(unittest.TestCase):
+    def test_ndjson_line_reaches_client_before_generator_finishes(self):
+        async def run():
+            finish = asyncio.Event()
+            messages = []
+            first_line = asyncio.Event()
+
+            async def app(scope, receive, send):
+                await send({
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [(b"content-type", b"application/x-ndjson")],
+                })
+                await send({"type": "http.response.body", "body": b'{"a": 1}\n', "more_body": True})
+                await finish.wait()
+                await send({"type": "http.response.body", "body": b'{"b": 2}\n', "more_body": False})
+
+            async def send(message):
+                messages.append(message)
+                if message.get("body"):
+                    first_line.set()
+
+            task = asyncio.ensure_future(GZipMiddleware(app, minimum_size=1)(_scope(), _receive, send))
+            await asyncio.wait_for(first_line.wait(), timeout=1)
+            self.assertFalse(task.done())
+            headers = dict(messages[0]["headers"])
+            self.assertNotIn(b"content-encoding", headers)
+            self.assertEqual(messages[1]["body"], b'{"a": 1}\n')
+            finish.set()
+            await task
+            self.assertEqual(messages[-1]["body"], b'{"b": 2}\n')
+
+        asyncio.run(run())
+
+    def _collect(self, body, content_type=b"application/json", path="/api/feed"):
+        messages = []
+
+        async def app(scope, receive, send):
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode())],
+            })
+            await send({"type": "http.response.body", "body": body})
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(GZipMiddleware(app, minimum_size=1024, exclude_paths=("/api/feed/proxy",))(
+            _scope(path), _receive, send
+        ))
+        return dict(messages[0]["headers"]), messages[1]["body"]
+
+    def test_large_json_is_compressed(self):
+        body = b'{"videos": [' + b'{"id": "1"},' * 500 + b'{}]}'
+        headers, data = self._collect(body)
+        self.assertEqual(headers[b"content-encoding"], b"gzip")
+        self.assertEqual(int(headers[b"content-length"]), len(data))
+        self.assertEqual(gzip.decompress(data), body)
+
+    def test_small_media_and_excluded_responses_pass_through(self):
+        body = b"x" * 4096
+        for small, kwargs in (
+            (b"{}", {}),
+            (body, {"content_type": b"video/mp4"}),
+            (body, {"path": "/api/feed/proxy"}),
+        ):
+            headers, data = self._collect(small, **kwargs)
+            self.assertNotIn(b"content-encoding", headers)
+            self.assertEqual(data, small)
+
+
+if __name__ == "__main__":
+    unittest.main()
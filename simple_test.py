@@ -1,10 +1,15 @@
-import urllib.request
+import http.client
 import json
 
+# One keep-alive connection for both calls
+conn = http.client.HTTPConnection("localhost", 8002, timeout=30)
+
 try:
     print("Testing /health...")
-    with urllib.request.urlopen("http://localhost:8002/health", timeout=5) as r:
-        print(f"Health: {r.status}")
+    conn.request("GET", "/health")
+    r = conn.getresponse()
+    r.read()  # Drain it so the connection can be reused
+    print(f"Health: {r.status}")
 
     print("Testing /api/feed...")
     with open("temp_cookies.json", "r") as f:
@@ -17,14 +22,16 @@ try:
     # Prepare body as dict for safety with new Union type
     body = {"credentials": data}
 
-    req = urllib.request.Request(
-        "http://localhost:8002/api/feed",
-        data=json.dumps(body).encode('utf-8'),
+    conn.request(
+        "POST", "/api/feed",
+        body=json.dumps(body).encode('utf-8'),
         headers={'Content-Type': 'application/json'}
     )
-    with urllib.request.urlopen(req, timeout=30) as r:
-        print(f"Feed: {r.status}")
-        print(r.read().decode('utf-8')[:100])
+    r = conn.getresponse()
+    print(f"Feed: {r.status}")
+    print(r.read().decode('utf-8')[:100])
 
 except Exception as e:
     print(f"Error: {e}")
+finally:
+    conn.close()
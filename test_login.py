@@ -3,10 +3,13 @@ import time
 
 URL = "http://localhost:8002/api/auth/admin-login"
 
+# Keep-alive session, reused across calls
+session = requests.Session()
+
 def test_login():
     print("Testing Admin Login...")
     try:
-        res = requests.post(URL, json={"password": "admin123"})
+        res = session.post(URL, json={"password": "admin123"})
         print(f"Status: {res.status_code}")
         print(f"Response: {res.text}")
     except Exception as e:
@@ -4,6 +4,9 @@ import time
 
 BASE_URL = "http://localhost:8002/api/user/search"
 
+# Keep-alive session, so repeated or timed calls don't pay for a new connection
+session = requests.Session()
+
 def test_search():
     print("Testing Search API...")
     try:
@@ -14,7 +17,7 @@ def test_search():
             "cursor": 0
         }
         start = time.time()
-        res = requests.get(BASE_URL, params=params)
+        res = session.get(BASE_URL, params=params)
         duration = time.time() - start
         
         print(f"Status Code: {res.status_code}")